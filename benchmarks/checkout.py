@@ -0,0 +1,11 @@
+"""
+Put the checkout holding this directory first on sys.path
+
+Imported by the benchmarks before lora, so that they measure the working
+tree without the package being installed.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
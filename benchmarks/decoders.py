@@ -0,0 +1,40 @@
+#! /usr/bin/env python
+"""
+Time each installed JSON decoder on large synthetic Lora payloads
+
+Usage: python benchmarks/decoders.py [scale]
+"""
+
+import sys
+import timeit
+
+import requests
+
+import checkout  # noqa: F401 (puts this checkout on sys.path)
+from lora.decoders import DECODERS, available
+from payloads import make_queue, make_users_info
+
+
+def response_json(content):
+    """
+    The previous code path: requests' Response.json() with charset detection
+    """
+    response = requests.Response()
+    response._content = content
+    return response.json()
+
+
+if __name__ == '__main__':
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    payloads = [
+        ('queue', make_queue(scale)),
+        ('users', make_users_info(scale // 2)),
+    ]
+    decoders = [('response.json', response_json)]
+    decoders.extend((name, DECODERS[name]) for name in sorted(DECODERS) if available(name))
+
+    for label, content in payloads:
+        print('%s (%.1f MiB)' % (label, len(content) / 2.0 ** 20))
+        for name, loads in decoders:
+            best = min(timeit.repeat(lambda: loads(content), number=1, repeat=5))
+            print('  %-14s %8.1f ms' % (name, best * 1000))
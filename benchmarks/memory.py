@@ -0,0 +1,236 @@
+#! /usr/bin/env python
+"""
+Report the peak and retained memory of the code paths handling large Lora payloads
+
+Every case runs in a fresh process against synthetic payloads at several
+scales, once under tracemalloc (Python allocations) and once without it
+(resident set size, Linux only). Payloads are served to real LoraSession
+methods from memory, so decoding and record conversion are measured as used.
+
+Usage: python benchmarks/memory.py [--scales 1000,10000,100000] [--save FILE] [--baseline FILE]
+
+With --baseline, exits non-zero if any peak grew by more than --tolerance
+(10% by default) over the saved results.
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+import requests
+
+import checkout  # noqa: F401 (puts this checkout on sys.path)
+from lora.session import LoraSession
+from lora.transports import Transport, TransportResponse
+from lora.util import get_num_jobs_per_host
+from payloads import make_queue, make_users_info, make_utilizations
+
+MiB = 2.0 ** 20
+
+
+class CannedTransport(Transport):
+    """
+    Answers every request with the same body, without any network
+    """
+
+    def __init__(self, content):
+        super(CannedTransport, self).__init__()
+        self.content = content
+
+    def send(self, method, url, body, headers, timeout, verify=True, cert=None):
+        return TransportResponse(200, {}, self.content, url)
+
+
+def response_json(content):
+    response = requests.Response()
+    response._content = content
+    return response.json()
+
+
+def session_for(content, records=False):
+    return LoraSession(records=records, transport=CannedTransport(content))
+
+
+# case name -> (payload kind, function of the raw body returning what the caller keeps)
+CASES = {
+    'queue/response.json': ('queue', response_json),
+    'queue/getAllJobDetails': ('queue', lambda c: session_for(c).getAllJobDetails()),
+    'queue/getAllJobDetails records': ('queue', lambda c: session_for(c, True).getAllJobDetails()),
+    'queue/get_num_jobs_per_host': ('queue', lambda c: get_num_jobs_per_host(session_for(c))),
+    'queue/get_num_jobs_per_host records': ('queue', lambda c: get_num_jobs_per_host(session_for(c, True))),
+    'users/response.json': ('users', response_json),
+    'users/getAllUsersInfo': ('users', lambda c: session_for(c).getAllUsersInfo()),
+    'users/getAllUsersInfo records': ('users', lambda c: session_for(c, True).getAllUsersInfo()),
+    'utilizations/response.json': ('utilizations', response_json),
+    'utilizations/getAllClusterUtilizations': ('utilizations', lambda c: session_for(c).getAllClusterUtilizations()),
+}
+
+# payload kind -> function building it at a scale
+PAYLOADS = {
+    'queue': make_queue,
+    'users': lambda scale: make_users_info(scale // 2),
+    # One host per 1000 scale, each with 90 days of hourly samples
+    'utilizations': lambda scale: make_utilizations(max(1, scale // 1000)),
+}
+
+
+def _status(field):
+    # A field of /proc/self/status in bytes, or None where it is not available
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except (IOError, OSError):
+        pass
+    return None
+
+
+def current_rss():
+    """
+    The resident set size of this process in bytes, or None where /proc is not available
+    """
+    return _status('VmRSS')
+
+
+def reset_peak_rss():
+    """
+    Reset the peak resident set size, so that imports do not hide a smaller peak
+
+    Returns False where the kernel does not allow it (before Linux 4.0, or without /proc).
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except (IOError, OSError):
+        return False
+    return True
+
+
+def peak_rss():
+    peak = _status('VmHWM')
+    if peak is None:
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak *= 1 if sys.platform == 'darwin' else 1024
+    return peak
+
+
+def run_case(name, path, mode):
+    """
+    Run one case on the payload at path in this process, returning its measurements in bytes
+    """
+    func = CASES[name][1]
+    with open(path, 'rb') as f:
+        content = f.read()
+
+    if mode == 'tracemalloc':
+        tracemalloc.start()
+        kept = func(content)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept
+        return {'retained': retained, 'peak': peak}
+
+    reset_peak_rss()
+    before = current_rss()
+    if before is None:
+        before = peak_rss()
+    kept = func(content)
+    after = current_rss()
+    del kept
+    return {
+        'rss_retained': None if after is None else after - before,
+        'rss_peak': max(0, peak_rss() - before),
+    }
+
+
+def measure(name, path):
+    """
+    Run one case in fresh processes for both modes
+    """
+    result = {}
+    for mode in ('tracemalloc', 'rss'):
+        output = subprocess.check_output([sys.executable, __file__, '--child', name, path, mode])
+        result.update(json.loads(output.decode('utf-8')))
+    return result
+
+
+def regressions(results, baseline, tolerance):
+    """
+    Get a message for every case whose peak grew beyond tolerance over the baseline
+    """
+    messages = []
+    for key, result in sorted(results.items()):
+        old = baseline.get(key)
+        if old is None or not old['peak']:
+            continue
+        growth = float(result['peak']) / old['peak'] - 1
+        if growth > tolerance:
+            messages.append('%s: peak %.1f MiB, was %.1f MiB (+%.0f%%)'
+                            % (key, result['peak'] / MiB, old['peak'] / MiB, 100 * growth))
+    return messages
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == '--child':
+        print(json.dumps(run_case(*sys.argv[2:])))
+        return
+
+    parser = argparse.ArgumentParser(description='Measure the memory used handling large Lora payloads')
+    parser.add_argument('--scales', default='1000,10000,100000',
+                        help='comma separated scales (jobs in the queue, twice the users)')
+    parser.add_argument('--cases', help='comma separated case names, by default all')
+    parser.add_argument('--save', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='compare peaks against results saved earlier')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='allowed peak growth over the baseline as a fraction')
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(',')]
+    names = args.cases.split(',') if args.cases else sorted(CASES)
+    kinds = sorted(set(CASES[name][0] for name in names))
+
+    results = {}
+    tmpdir = tempfile.mkdtemp(prefix='lora-memory-')
+    try:
+        for scale in scales:
+            paths = {}
+            for kind in kinds:
+                paths[kind] = os.path.join(tmpdir, '%s-%d.json' % (kind, scale))
+                with open(paths[kind], 'wb') as f:
+                    f.write(PAYLOADS[kind](scale))
+
+            print('scale %d' % scale)
+            print('  %-40s %9s %9s %9s %9s' % ('case', 'peak', 'retained', 'rss peak', 'rss kept'))
+            for name in names:
+                result = measure(name, paths[CASES[name][0]])
+                results['%s@%d' % (name, scale)] = result
+                print('  %-40s %9.1f %9.1f %9.1f %9s' % (
+                    name, result['peak'] / MiB, result['retained'] / MiB, result['rss_peak'] / MiB,
+                    '-' if result['rss_retained'] is None else '%.1f' % (result['rss_retained'] / MiB)))
+    finally:
+        shutil.rmtree(tmpdir)
+    print('(MiB; payload bytes excluded)')
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            messages = regressions(results, json.load(f), args.tolerance)
+        for message in messages:
+            print('REGRESSION %s' % message)
+        if messages:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
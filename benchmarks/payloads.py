@@ -0,0 +1,77 @@
+"""
+Synthetic Lora-shaped response payloads for the benchmarks
+"""
+
+import json
+import random
+
+HOSTS = ['cab', 'quartz', 'syrah', 'vulcan', 'surface', 'catalyst']
+STATES = ['RUNNING', 'PENDING', 'COMPLETING']
+PARTITIONS = ['pbatch', 'pdebug', 'pall']
+SHELLS = ['/bin/bash', '/bin/tcsh', '/bin/zsh']
+
+
+def wrap(output):
+    """
+    Wrap output in the standard Lora response envelope and encode it
+    """
+    return json.dumps({'error': '', 'status': 'OK', 'output': output}).encode('utf-8')
+
+
+def make_queue(njobs, seed=0):
+    """
+    Build the raw body of a /queue response with njobs jobs
+    """
+    rng = random.Random(seed)
+    users = ['user%d' % i for i in range(2000)]
+    banks = ['bank%d' % i for i in range(200)]
+    jobs = []
+    for jobid in range(njobs):
+        jobs.append({
+            'Host': rng.choice(HOSTS),
+            'JobID': 1000000 + jobid,
+            'State': rng.choice(STATES),
+            'User': rng.choice(users),
+            'Bank': rng.choice(banks),
+            'Partition': rng.choice(PARTITIONS),
+            'Name': 'job%d' % jobid,
+            'Nodes': rng.randint(1, 512),
+            'TimeLimit': '16:00:00',
+            'SubmitTime': '2016-08-04T10:00:00',
+            'StartTime': '2016-08-04T10:05:00',
+            'Reason': 'None',
+        })
+    return wrap({'jobs': jobs})
+
+
+def make_users_info(nusers, seed=0):
+    """
+    Build the raw body of a /user?info=all response with nusers users
+    """
+    rng = random.Random(seed)
+    users = {}
+    for uid in range(nusers):
+        username = 'user%d' % uid
+        users[username] = {
+            'username': username,
+            'uid': 10000 + uid,
+            'name': 'User Number %d' % uid,
+            'email': '%s@llnl.gov' % username,
+            'oun': 'o%06d' % uid,
+            'org': 'org%d' % rng.randint(0, 50),
+            'shell': rng.choice(SHELLS),
+            'home': '/g/g%d/%s' % (uid % 100, username),
+        }
+    return wrap(users)
+
+
+def make_utilizations(nhosts, nsamples=24 * 90, seed=0):
+    """
+    Build the raw body of a /status/clusters/utilization/hourly2 response
+
+    Each of nhosts hosts has nsamples hourly utilization percentages.
+    """
+    rng = random.Random(seed)
+    names = HOSTS + ['host%d' % i for i in range(max(0, nhosts - len(HOSTS)))]
+    return wrap(dict((host, [round(rng.uniform(0, 100), 2) for _ in range(nsamples)])
+                     for host in names[:nhosts]))
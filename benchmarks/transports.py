@@ -0,0 +1,78 @@
+#! /usr/bin/env python
+"""
+Compare requests per second of small Lora calls over each transport against a local server
+
+Usage: python benchmarks/transports.py [ncalls]
+"""
+
+import sys
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:  # Python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+import checkout  # noqa: F401 (puts this checkout on sys.path)
+from lora.session import LoraSession
+from lora.transports import TRANSPORTS
+
+BODY = b'{"error":"","output":{"stat":{"size":1024,"mode":"0644"}},"status":"OK"}'
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Send headers and body in one segment, as a real server would
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def serve():
+    server = Server(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def run(transport, domain, ncalls):
+    session = LoraSession(transport=transport)
+    session.base_url = '%s/lorenz/lora/lora.cgi' % domain
+    session.cookies.set('crowd.token_key', 'x' * 32)
+    session.getPathStat('oslic', '/g/g0/user/file')
+    start = time.time()
+    for _ in range(ncalls):
+        session.getPathStat('oslic', '/g/g0/user/file')
+    elapsed = time.time() - start
+    session.close()
+    return ncalls / elapsed
+
+
+if __name__ == '__main__':
+    ncalls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    server = serve()
+    domain = 'http://127.0.0.1:%d' % server.server_address[1]
+    for name in ['requests'] + sorted(TRANSPORTS):
+        try:
+            rate = run(name, domain, ncalls)
+        except ImportError as e:
+            print('%-10s not installed (%s)' % (name, e))
+            continue
+        print('%-10s %8.0f requests/s' % (name, rate))
@@ -0,0 +1,5 @@
+import sys
+
+from lora.cli import main
+
+sys.exit(main())
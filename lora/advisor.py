@@ -0,0 +1,156 @@
+"""
+Suggest where to submit a job for the quickest start
+
+Combines cached snapshots of backfill windows, machine loads, recent
+utilization, job limits and the user's banks into a score per cluster:
+
+    >>> advisor = ClusterAdvisor(session)
+    >>> advisor.rank(nodes=16, walltime='4:00:00', bank='lc')[0]
+    Advice(host='quartz', score=3.4, reasons=['backfill window fits', ...])
+"""
+
+import logging
+import threading
+import time
+from collections import namedtuple
+
+from lora.catalog import ClusterCatalog
+from lora.parallel import fan_out
+from lora.tracing import span
+from lora.util import parse_duration, parse_limit
+
+logger = logging.getLogger(__file__)
+
+Advice = namedtuple('Advice', ['host', 'score', 'reasons'])
+
+# Field names in the Lora outputs used for scoring
+BACKFILL_NODES_FIELD = 'nodes'
+BACKFILL_TIME_FIELD = 'duration'
+LOAD_FIELD = 'load'
+LIMIT_NODES_FIELD = 'max_nodes'
+LIMIT_TIME_FIELD = 'max_time'
+
+# Score weights: an open backfill window outweighs load and utilization
+BACKFILL_WEIGHT = 2.0
+LOAD_WEIGHT = 1.0
+UTILIZATION_WEIGHT = 1.0
+
+# Hourly utilization samples averaged for the recent utilization
+UTILIZATION_HOURS = 6
+
+# Snapshot name, method, and the key of the output holding the listing (None for the whole output)
+SNAPSHOT_METHODS = (
+    ('backfill', 'getClusterBackfill', None),
+    ('loads', 'getAllMachineLoads', 'clusters'),
+    ('utilizations', 'getAllClusterUtilizations', None),
+    ('banks', 'getUserBanksByHost', None),
+)
+
+
+def _by_host(output, host_field='host'):
+    """
+    Index an output given either as a dict of host -> value or a list of records
+    """
+    if isinstance(output, dict):
+        return output
+    return dict((item.get(host_field), item) for item in output)
+
+
+def _fraction(value):
+    # Loads and utilizations may be given as fractions or percentages
+    value = float(value)
+    return value / 100.0 if value > 1 else value
+
+
+class ClusterAdvisor(object):
+    """
+    Ranks clusters for a job shape from snapshots refreshed every max_age seconds
+    """
+
+    def __init__(self, lora_session, catalog=None, max_age=60):
+        self.session = lora_session
+        self.catalog = catalog
+        self.max_age = max_age
+
+        self.snapshot = None
+        self.fetched = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """
+        Fetch all snapshots concurrently
+        """
+        def call(method):
+            return getattr(self.session, method)()['output']
+
+        with span(self.session, 'ClusterAdvisor.refresh'):
+            if self.catalog is None:
+                self.catalog = ClusterCatalog.fetch(self.session)
+            outputs = fan_out(call, [method for _, method, _ in SNAPSHOT_METHODS])
+
+        snapshot = {}
+        for name, method, key in SNAPSHOT_METHODS:
+            output = outputs[method] if key is None else outputs[method][key]
+            snapshot[name] = _by_host(output)
+        with self._lock:
+            self.snapshot = snapshot
+            self.fetched = time.time()
+
+    def _current(self):
+        if self.fetched is None or time.time() - self.fetched > self.max_age:
+            self.refresh()
+        return self.snapshot
+
+    def score(self, host, nodes, walltime, bank=None):
+        """
+        Score one cluster for a job, returning an Advice with a score of None if the job cannot run there
+        """
+        snapshot = self._current()
+        walltime = parse_duration(walltime)
+        reasons = []
+
+        banks = snapshot['banks'].get(host)
+        if not banks:
+            return Advice(host, None, ['no bank on this host'])
+        if bank is not None and bank not in banks:
+            return Advice(host, None, ['bank %s not available' % bank])
+
+        limits = self.catalog.getJobLimits(host) if host in self.catalog else {}
+        max_nodes = parse_limit(limits.get(LIMIT_NODES_FIELD))
+        if max_nodes is not None and nodes > max_nodes:
+            return Advice(host, None, ['more than %s nodes' % max_nodes])
+        max_time = parse_limit(limits.get(LIMIT_TIME_FIELD), parse_duration)
+        if max_time is not None and walltime > max_time:
+            return Advice(host, None, ['longer than %s' % limits[LIMIT_TIME_FIELD]])
+
+        def fits(window):
+            if int(window.get(BACKFILL_NODES_FIELD, 0)) < nodes:
+                return False
+            return parse_duration(window.get(BACKFILL_TIME_FIELD, 0)) >= walltime
+
+        score = 0.0
+        if any(fits(w) for w in snapshot['backfill'].get(host) or []):
+            score += BACKFILL_WEIGHT
+            reasons.append('backfill window fits')
+
+        load = (snapshot['loads'].get(host) or {}).get(LOAD_FIELD)
+        load = 0.5 if load is None else _fraction(load)
+        score += LOAD_WEIGHT * (1 - load)
+        reasons.append('load %.0f%%' % (100 * load))
+
+        samples = snapshot['utilizations'].get(host) or []
+        recent = [_fraction(s) for s in samples[-UTILIZATION_HOURS:] if s is not None]
+        utilization = sum(recent) / len(recent) if recent else 0.5
+        score += UTILIZATION_WEIGHT * (1 - utilization)
+        reasons.append('utilization %.0f%%' % (100 * utilization))
+
+        return Advice(host, round(score, 3), reasons)
+
+    def rank(self, nodes, walltime, bank=None):
+        """
+        Get the Advice for every cluster the job can run on, best first
+        """
+        snapshot = self._current()
+        hosts = set(snapshot['banks']) | set(self.catalog.hosts)
+        advice = [self.score(host, nodes, walltime, bank) for host in sorted(hosts)]
+        return sorted((a for a in advice if a.score is not None), key=lambda a: -a.score)
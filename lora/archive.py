@@ -0,0 +1,145 @@
+"""
+Local archive of completed jobs
+
+Completed jobs never change, so they only need to be downloaded once. The
+archive is an SQLite database holding each job as compressed JSON, keyed by
+(host, jobid) and indexed by user, bank and end time:
+
+    >>> archive = JobArchive('jobs.db')
+    >>> archive.update(session, 31)
+    12
+    >>> for job in archive.query(bank='lc', start='2016-08-01', end='2016-09-01'):
+    ...     print(job['JobID'])
+"""
+
+import json
+import sqlite3
+import zlib
+
+from lora.jobs import JOB_BANK_FIELD, JOB_END_FIELD, JOB_HOST_FIELD, JOB_ID_FIELD, JOB_USER_FIELD
+from lora.util import normalize_timestamp
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    host TEXT NOT NULL,
+    jobid TEXT NOT NULL,
+    user TEXT,
+    bank TEXT,
+    end_time TEXT,
+    data BLOB NOT NULL,
+    PRIMARY KEY (host, jobid)
+);
+CREATE INDEX IF NOT EXISTS jobs_user ON jobs (user, end_time);
+CREATE INDEX IF NOT EXISTS jobs_bank ON jobs (bank, end_time);
+CREATE INDEX IF NOT EXISTS jobs_end_time ON jobs (end_time);
+CREATE TABLE IF NOT EXISTS sacct (
+    host TEXT NOT NULL,
+    jobid TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (host, jobid)
+);
+'''
+
+
+def _successful(response):
+    return response.get('status') == 'OK' and not response.get('error') and bool(response.get('output'))
+
+
+def _pack(obj):
+    return sqlite3.Binary(zlib.compress(json.dumps(obj, separators=(',', ':')).encode('utf-8')))
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(bytes(blob)).decode('utf-8'))
+
+
+class JobArchive(object):
+    """
+    Completed jobs stored locally, deduplicated by (host, jobid)
+
+    Not safe to share between threads; open one archive per thread.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def __len__(self):
+        return self.db.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+
+    def __contains__(self, key):
+        host, jobid = key
+        row = self.db.execute('SELECT 1 FROM jobs WHERE host = ? AND jobid = ?', (host, str(jobid))).fetchone()
+        return row is not None
+
+    def ingest(self, jobs):
+        """
+        Store the jobs not archived yet, returning how many were new
+        """
+        before = self.db.total_changes
+        with self.db:
+            self.db.executemany(
+                'INSERT OR IGNORE INTO jobs (host, jobid, user, bank, end_time, data) VALUES (?, ?, ?, ?, ?, ?)',
+                ((job.get(JOB_HOST_FIELD), str(job.get(JOB_ID_FIELD)), job.get(JOB_USER_FIELD),
+                  job.get(JOB_BANK_FIELD), normalize_timestamp(job.get(JOB_END_FIELD)), _pack(dict(job)))
+                 for job in jobs))
+        return self.db.total_changes - before
+
+    def update(self, lora_session, period, username='ME'):
+        """
+        Archive a user's jobs completed in the last period days, returning how many were new
+        """
+        data = lora_session.getUserCompletedJobs(period, username)
+        return self.ingest(data['output']['jobs'])
+
+    def query(self, user=None, bank=None, host=None, start=None, end=None):
+        """
+        Yield archived jobs by user, bank and host that ended in [start, end)
+        """
+        clauses = []
+        params = []
+        for column, value in (('user', user), ('bank', bank), ('host', host)):
+            if value is not None:
+                clauses.append('%s = ?' % column)
+                params.append(value)
+        if start is not None:
+            clauses.append('end_time >= ?')
+            params.append(normalize_timestamp(start))
+        if end is not None:
+            clauses.append('end_time < ?')
+            params.append(normalize_timestamp(end))
+
+        sql = 'SELECT data FROM jobs'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        for (blob,) in self.db.execute(sql + ' ORDER BY end_time', params):
+            yield _unpack(blob)
+
+    def getSacctJobDetails(self, lora_session, host, jobid, startDate, endDate):
+        """
+        Get a job's sacct details from the archive, fetching and storing them on a miss
+
+        Only successful responses with some output are stored, so a failed
+        lookup is retried on the next call.
+        """
+        row = self.db.execute('SELECT data FROM sacct WHERE host = ? AND jobid = ?', (host, str(jobid))).fetchone()
+        if row is not None:
+            return _unpack(row[0])
+
+        details = lora_session.getSacctJobDetails(host, jobid, startDate, endDate)
+        if not _successful(details):
+            return details
+        with self.db:
+            self.db.execute('INSERT OR REPLACE INTO sacct (host, jobid, data) VALUES (?, ?, ?)',
+                            (host, str(jobid), _pack(details)))
+        return details
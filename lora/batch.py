@@ -0,0 +1,145 @@
+"""
+Deferred calls run together in one concurrent batch
+
+Code written as a sequence of independent calls pays their latencies one
+after the other. In a batch, the same calls are queued instead and all run
+concurrently when the block ends, or as soon as one result is needed:
+
+    >>> with session.batch() as b:
+    ...     news = b.getAllNews()
+    ...     quota = b.getUserDiskQuotaInfo('lee1001')
+    ...     banks = b.getUserBanks('lee1001')
+    >>> news['output']
+
+Each call returns a Deferred, which reads like the response dict once the
+batch has run. A call that failed raises its exception when its result is
+read, not when the batch runs.
+"""
+
+import logging
+import threading
+
+from lora.parallel import DEFAULT_MAX_WORKERS, fan_out_iter
+from lora.tracing import span
+
+logger = logging.getLogger(__file__)
+
+
+class Deferred(object):
+    """
+    The pending result of a call queued in a Batch
+    """
+
+    def __init__(self, batch, name, args, kwargs):
+        self.batch = batch
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+
+        self.done = False
+        self._value = None
+        self._error = None
+
+    def _resolve(self, value=None, error=None):
+        self._value = value
+        self._error = error
+        self.done = True
+
+    def result(self):
+        """
+        Get the result of the call, running the batch first if it has not run yet
+        """
+        if not self.done:
+            self.batch.run()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def __getitem__(self, key):
+        return self.result()[key]
+
+    def __contains__(self, key):
+        return key in self.result()
+
+    def __iter__(self):
+        return iter(self.result())
+
+    def __len__(self):
+        return len(self.result())
+
+    def get(self, key, default=None):
+        return self.result().get(key, default)
+
+    def keys(self):
+        return self.result().keys()
+
+    def values(self):
+        return self.result().values()
+
+    def items(self):
+        return self.result().items()
+
+    def __repr__(self):
+        if not self.done:
+            return '<Deferred %s (pending)>' % self.name
+        return repr(self.result())
+
+
+class Batch(object):
+    """
+    Queues calls to LoraSession methods and runs them concurrently
+
+    Any session method can be called on the batch; it returns a Deferred.
+    Calls queued after the batch has run are run by the next access or at
+    the end of the block.
+    """
+
+    def __init__(self, lora_session, max_workers=DEFAULT_MAX_WORKERS, deadline=None):
+        self.session = lora_session
+        self.max_workers = max_workers
+        self.deadline = deadline
+
+        self.pending = []
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        attribute = getattr(self.session, name)
+        if not callable(attribute):
+            return attribute
+
+        def queue(*args, **kwargs):
+            deferred = Deferred(self, name, args, kwargs)
+            with self._lock:
+                self.pending.append(deferred)
+            return deferred
+        return queue
+
+    def _call(self, deferred):
+        return getattr(self.session, deferred.name)(*deferred.args, **deferred.kwargs)
+
+    def run(self):
+        """
+        Run every queued call concurrently
+        """
+        with self._lock:
+            pending, self.pending = self.pending, []
+            if not pending:
+                return
+
+            logger.debug('Running a batch of %d calls', len(pending))
+            with span(self.session, 'Batch.run', calls=len(pending)):
+                for deferred, future in fan_out_iter(self._call, pending, self.max_workers, deadline=self.deadline):
+                    error = future.exception()
+                    if error is None:
+                        deferred._resolve(future.result())
+                    else:
+                        deferred._resolve(error=error)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.run()
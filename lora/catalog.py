@@ -0,0 +1,144 @@
+"""
+Catalog of static cluster metadata
+
+Fetches the details, topology and job limits of every cluster in one go,
+concurrently, and can persist them to disk so tools start instantly.
+"""
+
+import json
+import logging
+import time
+from collections import namedtuple
+
+from lora.parallel import DEFAULT_MAX_WORKERS, fan_out
+from lora.topology import TopologyIndex
+from lora.tracing import span
+
+logger = logging.getLogger(__file__)
+
+ClusterRecord = namedtuple('ClusterRecord', ['host', 'details', 'topology', 'limits'])
+
+# Per-host endpoints fetched for every cluster, keyed by ClusterRecord field
+HOST_ENDPOINTS = (
+    ('details', 'getHostDetails'),
+    ('topology', 'getHostTopology'),
+    ('limits', 'getHostJobLimits'),
+)
+
+
+class ClusterCatalog(object):
+    """
+    Static metadata for every cluster, keyed by host name
+    """
+
+    def __init__(self, records=None, fetched=None):
+        self.records = dict((r.host, r) for r in (records or ()))
+        self.fetched = fetched
+        self._topologies = {}
+
+    @classmethod
+    def fetch(cls, lora_session, hosts=None, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Build a catalog from Lora
+
+        All per-host calls are issued concurrently. If hosts is None, every
+        cluster returned by getAllClusters() is included.
+        """
+        def call(key):
+            host, method = key
+            return getattr(lora_session, method)(host)['output']
+
+        with span(lora_session, 'ClusterCatalog.fetch'):
+            if hosts is None:
+                hosts = lora_session.getAllClusters()['output']['accounts']
+            keys = [(host, method) for host in hosts for _, method in HOST_ENDPOINTS]
+            results = fan_out(call, keys, max_workers)
+
+        records = []
+        for host in hosts:
+            fields = dict((field, results[(host, method)]) for field, method in HOST_ENDPOINTS)
+            records.append(ClusterRecord(host=host, **fields))
+
+        logger.info('Fetched catalog for %d clusters', len(records))
+        return cls(records, fetched=time.time())
+
+    def save(self, path):
+        """
+        Write the catalog to a JSON file
+        """
+        data = {
+            'fetched': self.fetched,
+            'records': [r._asdict() for r in self.records.values()],
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a catalog previously written by save()
+        """
+        with open(path) as f:
+            data = json.load(f)
+        records = [ClusterRecord(**r) for r in data['records']]
+        return cls(records, fetched=data.get('fetched'))
+
+    @classmethod
+    def cached(cls, lora_session, path, max_age=86400):
+        """
+        Load the catalog from path, re-fetching and saving it if missing or older than max_age
+        """
+        try:
+            catalog = cls.load(path)
+        except (IOError, OSError, ValueError, KeyError):
+            catalog = None
+
+        if catalog is None or catalog.age is None or catalog.age > max_age:
+            catalog = cls.fetch(lora_session)
+            catalog.save(path)
+        return catalog
+
+    @property
+    def age(self):
+        """
+        Seconds since the catalog was fetched from Lora
+        """
+        if self.fetched is None:
+            return None
+        return time.time() - self.fetched
+
+    @property
+    def hosts(self):
+        return sorted(self.records)
+
+    def __contains__(self, host):
+        return host in self.records
+
+    def __getitem__(self, host):
+        return self.records[host]
+
+    def getCoresPerNode(self, host):
+        """
+        Get the number of cores on each node of a host
+        """
+        return self.records[host].details.get('cores_per_node')
+
+    def getPartitions(self, host):
+        """
+        Get the list of partitions (pools) on a host
+        """
+        return self.records[host].details.get('partitions', [])
+
+    def getJobLimits(self, host):
+        """
+        Get the job limits for a host
+        """
+        return self.records[host].limits
+
+    def getTopology(self, host):
+        """
+        Get the lora.topology.TopologyIndex of a host, parsed on first use
+        """
+        if host not in self._topologies:
+            self._topologies[host] = TopologyIndex.from_output(host, self.records[host].topology)
+        return self._topologies[host]
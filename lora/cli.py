@@ -0,0 +1,199 @@
+"""
+Command line interface to Lora
+
+    $ lora login
+    $ lora getAllClusters
+    $ lora --ndjson getAllJobDetails | head
+    $ lora --ndjson --hosts cab,quartz getAllJobDetailsForHost | jq .User
+
+Every LoraSession method can be called by name, with its arguments given
+positionally; arguments starting with '{' or '[' are parsed as JSON. The
+login is saved and reused by later invocations until it expires.
+
+Only the standard library is imported until a request is actually made, so
+the tool starts quickly.
+"""
+
+import argparse
+import errno
+import json
+import os
+import sys
+
+LOGIN_FILES = {
+    'cz': os.path.join('~', '.lora_login'),
+    'rz': os.path.join('~', '.lora_rz_login'),
+}
+
+
+def login_file(zone):
+    return os.path.expanduser(os.environ.get('LORA_LOGIN_FILE', LOGIN_FILES[zone]))
+
+
+def make_session(zone, decoder=None):
+    from lora.session import LoraSession, RZLoraSession
+
+    cls = RZLoraSession if zone == 'rz' else LoraSession
+    return cls(decoder=decoder)
+
+
+def open_session(zone, decoder=None, daemon=False):
+    """
+    Get a session using the local daemon or the saved login, logging in interactively if there is neither
+    """
+    session = make_session(zone, decoder)
+    if daemon:
+        session.use_daemon()
+        return session
+
+    path = login_file(zone)
+    if os.path.exists(path) and session.load_login(path):
+        return session
+
+    session.login()
+    session.save_login(path)
+    return session
+
+
+def parse_arg(arg):
+    if arg[:1] in ('{', '['):
+        return json.loads(arg)
+    return arg
+
+
+def iter_records(data):
+    """
+    Yield the individual records of a response for NDJSON output
+
+    List outputs (or a dict holding a single list, such as {'jobs': [...]})
+    yield their items, dicts of dicts yield their values, and anything else
+    is yielded whole.
+    """
+    output = data.get('output') if isinstance(data, dict) else None
+    if isinstance(output, dict) and len(output) == 1:
+        only = list(output.values())[0]
+        if isinstance(only, list):
+            output = only
+    if isinstance(output, list):
+        return iter(output)
+    if isinstance(output, dict) and output and all(isinstance(v, dict) for v in output.values()):
+        return iter(output.values())
+    return iter([data])
+
+
+def tag_host(record, host):
+    if isinstance(record, dict) and 'Host' not in record and 'host' not in record:
+        record['host'] = host
+    return record
+
+
+def write(out, obj, ndjson):
+    if ndjson:
+        out.write(json.dumps(obj, separators=(',', ':')))
+    else:
+        out.write(json.dumps(obj, indent=4, sort_keys=True))
+    out.write('\n')
+
+
+def call_method(session, args, params):
+    method = getattr(session, args.method, None)
+    if args.method.startswith('_') or not callable(method):
+        raise SystemExit('Unknown Lora method: %s' % args.method)
+
+    out = sys.stdout
+    if not args.hosts and not args.all_hosts:
+        data = method(*params)
+        records = iter_records(data) if args.ndjson else [data]
+        for record in records:
+            write(out, record, args.ndjson)
+        return
+
+    from lora.parallel import fan_out_iter
+
+    hosts = args.hosts.split(',') if args.hosts else session.getAllClusters()['output']['accounts']
+    results = fan_out_iter(lambda host: method(host, *params), hosts, args.workers, args.timeout)
+    failed = False
+    for host, future in results:
+        if not future.done() or future.exception() is not None:
+            error = future.exception() if future.done() else 'timed out'
+            sys.stderr.write('%s: %s\n' % (host, error))
+            failed = True
+            continue
+        data = future.result()
+        if args.ndjson:
+            for record in iter_records(data):
+                write(out, tag_host(record, host), True)
+        else:
+            write(out, {'host': host, 'response': data}, False)
+        out.flush()
+    if failed:
+        raise SystemExit(1)
+
+
+def list_methods():
+    from lora.session import LoraSession
+
+    for name in sorted(dir(LoraSession)):
+        attr = getattr(LoraSession, name)
+        if name[:1].islower() and callable(attr) and name in vars(LoraSession):
+            doc = (attr.__doc__ or '').strip().splitlines()
+            print('%-28s %s' % (name, doc[0] if doc else ''))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='lora', description='Query the LC Lorenz REST API')
+    parser.add_argument('--rz', dest='zone', action='store_const', const='rz', default='cz',
+                        help='use the RZ instance (rzlc.llnl.gov)')
+    parser.add_argument('--ndjson', action='store_true',
+                        help='write one JSON record per line')
+    parser.add_argument('--daemon', action='store_true',
+                        help='send requests through the local caching daemon (python -m lora.daemon)')
+    parser.add_argument('--decoder', help='JSON decoder: json, orjson or ujson')
+    parser.add_argument('--hosts', help='comma separated hosts to call the method for, concurrently')
+    parser.add_argument('--all-hosts', action='store_true',
+                        help='call the method for every cluster, concurrently')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='concurrent requests with --hosts (default: 8)')
+    parser.add_argument('--timeout', type=float,
+                        help='seconds to wait for each host with --hosts')
+    parser.add_argument('method', help="LoraSession method, 'login' or 'methods'")
+    parser.add_argument('args', nargs='*', help='method arguments')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.method == 'methods':
+        list_methods()
+        return 0
+
+    if args.method == 'login':
+        session = make_session(args.zone)
+        session.login(*args.args)
+        session.save_login(login_file(args.zone))
+        return 0
+
+    try:
+        params = [parse_arg(a) for a in args.args]
+    except ValueError as e:
+        sys.stderr.write('Invalid JSON argument: %s\n' % e)
+        return 2
+
+    session = open_session(args.zone, args.decoder, args.daemon)
+    try:
+        call_method(session, args, params)
+    except ValueError as e:
+        # An expired login is answered with the HTML login page
+        sys.stderr.write("Could not decode the response (%s); try 'lora login'\n" % e)
+        return 1
+    except IOError as e:
+        if e.errno != errno.EPIPE:
+            raise
+        # The reader (head, jq, ...) went away; stop quietly
+        sys.stdout = open(os.devnull, 'w')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
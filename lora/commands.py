@@ -0,0 +1,38 @@
+"""
+Run commands on many hosts at once
+"""
+
+from collections import namedtuple
+
+from lora.parallel import DEFAULT_MAX_WORKERS, fan_out_iter
+
+# One host's outcome: the execCommand() response, or the error it raised.
+# Stragglers that did not answer within the timeout have straggler=True.
+CommandResult = namedtuple('CommandResult', ['host', 'response', 'error', 'straggler'])
+
+
+def exec_on_hosts(lora_session, hosts, command, options=None, timeout=None,
+                  max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Run a command on many hosts concurrently, yielding a CommandResult per host as each completes
+
+    Hosts that have not answered timeout seconds after their request started
+    are yielded as stragglers, so one slow host never blocks the sweep.
+    """
+    def run(host):
+        return lora_session.execCommand(host, command, options)
+
+    for host, future in fan_out_iter(run, hosts, max_workers, timeout):
+        if not future.done():
+            yield CommandResult(host, None, None, True)
+        elif future.exception() is not None:
+            yield CommandResult(host, None, future.exception(), False)
+        else:
+            yield CommandResult(host, future.result(), None, False)
+
+
+def stragglers(results):
+    """
+    Get the hosts that did not answer in time from an iterable of CommandResults
+    """
+    return [r.host for r in results if r.straggler]
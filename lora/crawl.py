@@ -0,0 +1,122 @@
+"""
+Resumable crawls of per-key Lora endpoints
+
+Audits calling one endpoint for every user (getUserDiskQuotaInfo,
+getUserCpuUsage, getUserBanks, ...) run concurrently, and record every
+result in a JSON lines checkpoint as it arrives. Running the same crawl
+again skips the keys already fetched:
+
+    >>> crawl = Crawl(session, 'getUserDiskQuotaInfo', session.getAllUsers()['output']['users'], 'quotas.jsonl')
+    >>> crawl.run()
+    >>> quotas = dict(crawl.results())
+"""
+
+import json
+import logging
+from collections import namedtuple
+
+from lora.parallel import DEFAULT_MAX_WORKERS, fan_out_iter
+from lora.tracing import span
+
+logger = logging.getLogger(__file__)
+
+CrawlStats = namedtuple('CrawlStats', ['fetched', 'skipped', 'failed'])
+
+
+class Crawl(object):
+    """
+    Calls a LoraSession method for every key, checkpointing results to a JSON lines file
+
+    Each line of the checkpoint holds {"key": ..., "result": ...} or, for a
+    failed call, {"key": ..., "error": ...}. Failed keys are retried on the
+    next run; keys must be JSON serializable.
+    """
+
+    def __init__(self, lora_session, method, keys, path, max_workers=DEFAULT_MAX_WORKERS):
+        self.session = lora_session
+        self.method = getattr(lora_session, method) if isinstance(method, str) else method
+        self.keys = list(keys)
+        self.path = path
+        self.max_workers = max_workers
+
+    def _entries(self):
+        try:
+            f = open(self.path)
+        except (IOError, OSError):
+            return
+        with f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A line cut short by an interrupted run
+                    continue
+
+    def _ends_mid_line(self):
+        # Whether an interrupted run left the last line of the checkpoint unterminated
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(0, 2)
+                if f.tell() == 0:
+                    return False
+                f.seek(-1, 2)
+                return f.read(1) != b'\n'
+        except (IOError, OSError):
+            return False
+
+    def completed(self):
+        """
+        The keys whose results are already in the checkpoint
+        """
+        return set(_hashable(e['key']) for e in self._entries() if 'result' in e)
+
+    def results(self):
+        """
+        Yield (key, result) for every successful call in the checkpoint
+        """
+        for entry in self._entries():
+            if 'result' in entry:
+                yield entry['key'], entry['result']
+
+    def run(self, sink=None, timeout=None, deadline=None):
+        """
+        Fetch every key not yet in the checkpoint
+
+        If given, sink(key, result) is called for each new result as it
+        arrives. Calls still unanswered after timeout seconds, or failing
+        once deadline seconds have passed, are recorded as failed and
+        retried on the next run. Returns CrawlStats counting fetched,
+        skipped and failed keys.
+        """
+        done = self.completed()
+        todo = [k for k in self.keys if _hashable(k) not in done]
+        skipped = len(self.keys) - len(todo)
+        logger.info('Crawling %d keys, %d already done', len(todo), skipped)
+
+        fetched = failed = 0
+        cut_short = self._ends_mid_line()
+        with span(self.session, 'Crawl.run', keys=len(todo)), open(self.path, 'a') as f:
+            if cut_short:
+                # Keep the first new entry off the partial line, which is skipped when read
+                f.write('\n')
+            for key, future in fan_out_iter(self.method, todo, self.max_workers, timeout, deadline):
+                if future.done() and future.exception() is None:
+                    entry = {'key': key, 'result': future.result()}
+                    fetched += 1
+                else:
+                    error = future.exception() if future.done() else 'timed out'
+                    entry = {'key': key, 'error': str(error)}
+                    failed += 1
+                f.write(json.dumps(entry) + '\n')
+                f.flush()
+                if sink is not None and 'result' in entry:
+                    sink(key, entry['result'])
+
+        return CrawlStats(fetched, skipped, failed)
+
+
+def _hashable(key):
+    # Keys read back from JSON come back as lists instead of tuples
+    if isinstance(key, list):
+        return tuple(_hashable(k) for k in key)
+    return key
@@ -0,0 +1,213 @@
+"""
+Local caching proxy shared by all Lora clients of one user on a node
+
+The daemon holds a single logged in LoraSession and serves requests from
+local clients on 127.0.0.1, answering repeated GETs from a short-lived cache
+and coalescing identical concurrent GETs into one request to Lora:
+
+    $ python -m lora.daemon --ttl 60 &
+
+    >>> session = lora.LoraSession()
+    >>> session.use_daemon()
+    >>> session.getAllClusters()
+
+Clients find the daemon through a file, readable only by the user, holding
+its URL and a random token that must accompany every request, so other users
+on the node cannot borrow the login.
+"""
+
+import argparse
+import binascii
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:  # Python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+from lora.util import open_private
+
+logger = logging.getLogger(__file__)
+
+DAEMON_FILE = os.path.join('~', '.lora_daemon')
+DEFAULT_PORT = 0
+TOKEN_HEADER = 'X-Lora-Daemon-Token'
+
+
+def daemon_file(path=None):
+    return os.path.expanduser(path or os.environ.get('LORA_DAEMON_FILE', DAEMON_FILE))
+
+
+def read_daemon_file(path=None):
+    """
+    Get the URL and token of the running daemon
+    """
+    with open(daemon_file(path)) as f:
+        return json.load(f)
+
+
+class CachingProxy(object):
+    """
+    Forwards requests through a LoraSession, caching GET responses for ttl seconds
+    """
+
+    def __init__(self, lora_session, ttl=60, max_entries=1024):
+        self.session = lora_session
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._cache = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def forward(self, method, path, body=None, content_type=None):
+        """
+        Send a request to Lora, returning (status, content type, body)
+        """
+        headers = {'Content-Type': content_type} if content_type else {}
+        response = self.session.request(method, self.session.domain + path, data=body, headers=headers)
+        return response.status_code, response.headers.get('Content-Type'), response.content
+
+    def get(self, path):
+        """
+        GET a path, from the cache if fresh, sharing one request among concurrent callers
+        """
+        with self._lock:
+            entry = self._cache.get(path)
+            if entry is not None and entry[0] > time.time():
+                self.hits += 1
+                return entry[1]
+            event = self._inflight.get(path)
+            leader = event is None
+            if leader:
+                event = self._inflight[path] = threading.Event()
+            self.misses += 1
+
+        if not leader:
+            event.wait()
+            with self._lock:
+                entry = self._cache.get(path)
+            if entry is not None:
+                return entry[1]
+            # The leader's request failed or was not cacheable; make our own
+            return self.forward('GET', path)
+
+        try:
+            result = self.forward('GET', path)
+            if result[0] == 200:
+                self._store(path, result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[path]
+            event.set()
+
+    def _store(self, path, result):
+        now = time.time()
+        with self._lock:
+            if len(self._cache) >= self.max_entries:
+                for key in [k for k, e in self._cache.items() if e[0] <= now]:
+                    del self._cache[key]
+            if len(self._cache) >= self.max_entries:
+                del self._cache[min(self._cache, key=lambda k: self._cache[k][0])]
+            self._cache[path] = (now + self.ttl, result)
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+
+    def _handle(self, method):
+        if self.headers.get(TOKEN_HEADER) != self.server.token:
+            self.send_error(403)
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else None
+        try:
+            if method == 'GET':
+                status, content_type, content = self.server.proxy.get(self.path)
+            else:
+                status, content_type, content = self.server.proxy.forward(
+                    method, self.path, body, self.headers.get('Content-Type'))
+        except Exception as e:
+            logger.warning('Request for %s failed: %s', self.path, e)
+            self.send_error(502)
+            return
+
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+class DaemonServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, proxy, address=('127.0.0.1', DEFAULT_PORT)):
+        HTTPServer.__init__(self, address, DaemonHandler)
+        self.proxy = proxy
+        self.token = binascii.hexlify(os.urandom(16)).decode('ascii')
+
+    @property
+    def url(self):
+        return 'http://%s:%d' % self.server_address[:2]
+
+    def write_daemon_file(self, path=None):
+        """
+        Publish the URL and token for clients in a file readable only by the user
+        """
+        with open_private(daemon_file(path)) as f:
+            json.dump({'url': self.url, 'token': self.token, 'pid': os.getpid()}, f)
+
+
+def main(argv=None):
+    from lora.cli import open_session
+
+    parser = argparse.ArgumentParser(prog='python -m lora.daemon',
+                                     description='Serve cached Lora responses to local clients')
+    parser.add_argument('--rz', dest='zone', action='store_const', const='rz', default='cz')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='port on 127.0.0.1 (default: any free port)')
+    parser.add_argument('--ttl', type=float, default=60, help='seconds to cache GET responses (default: 60)')
+    parser.add_argument('--file', help='where to publish the daemon URL and token (default: ~/.lora_daemon)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    proxy = CachingProxy(open_session(args.zone), ttl=args.ttl)
+    server = DaemonServer(proxy, ('127.0.0.1', args.port))
+    server.write_daemon_file(args.file)
+    logger.info('Serving Lora on %s', server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.remove(daemon_file(args.file))
+    return 0
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Deadlines bounding how long a whole operation may take
+
+Every request already gets the session's connect and read timeouts. A
+deadline additionally shrinks those timeouts to the time left, so that a
+sequence of calls finishes or fails within a bounded time:
+
+    >>> with deadline(10):
+    ...     session.getHostInfo('cab')
+    ...     session.getUserInfo('lee1001')
+
+Deadlines nest (an inner deadline can only shorten the outer one) and follow
+calls into the worker threads of lora.parallel, which also accept a
+deadline for a whole batch. Once a deadline has passed, requests fail with
+DeadlineExceeded before being sent. requests applies the read timeout to
+each read rather than the whole body, so a call can overrun the deadline by
+a little, but the calls after it fail at once.
+"""
+
+import contextlib
+import threading
+import time
+
+import requests
+
+clock = getattr(time, 'monotonic', time.time)
+
+_local = threading.local()
+
+
+class DeadlineExceeded(requests.Timeout):
+    pass
+
+
+def current():
+    """
+    The deadline of the current thread as a clock() time, or None
+    """
+    return getattr(_local, 'deadline', None)
+
+
+def remaining():
+    """
+    Seconds left before the current deadline, or None without one
+    """
+    end = current()
+    return None if end is None else end - clock()
+
+
+def _combine(seconds):
+    end = current()
+    if seconds is None:
+        return end
+    new = clock() + seconds
+    return new if end is None else min(end, new)
+
+
+@contextlib.contextmanager
+def deadline(seconds):
+    """
+    Bound the requests made in the enclosed block to seconds from now; None keeps any current deadline
+    """
+    previous = current()
+    _local.deadline = _combine(seconds)
+    try:
+        yield
+    finally:
+        _local.deadline = previous
+
+
+def propagate(func, seconds=None):
+    """
+    Wrap func to run under the current deadline, optionally shortened to seconds from now, in any thread
+    """
+    end = _combine(seconds)
+    if end is None:
+        return func
+
+    def run(*args, **kwargs):
+        previous = current()
+        _local.deadline = end
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.deadline = previous
+    return run
+
+
+def bound(timeout):
+    """
+    Shrink a requests timeout (seconds or a (connect, read) tuple) to the time left before the deadline
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded('Deadline exceeded')
+    if timeout is None:
+        return left
+    if isinstance(timeout, tuple):
+        return tuple(left if t is None else min(t, left) for t in timeout)
+    return min(timeout, left)
@@ -0,0 +1,68 @@
+"""
+JSON decoders for Lora responses
+
+Lora always sends UTF-8, so responses are decoded straight from the raw bytes
+instead of going through requests' charset detection. Faster third party
+decoders are used when installed.
+"""
+
+import json
+import logging
+
+logger = logging.getLogger(__file__)
+
+
+def _stdlib_loads(content):
+    return json.loads(content.decode('utf-8'))
+
+
+def _orjson_loads(content):
+    import orjson
+    return orjson.loads(content)
+
+
+def _ujson_loads(content):
+    import ujson
+    return ujson.loads(content)
+
+
+DECODERS = {
+    'json': _stdlib_loads,
+    'orjson': _orjson_loads,
+    'ujson': _ujson_loads,
+}
+
+# Order in which decoders are tried when none is requested explicitly
+PREFERENCE = ('orjson', 'ujson', 'json')
+
+
+def available(name):
+    """
+    Check whether the named decoder can be used here
+    """
+    if name == 'json':
+        return True
+    try:
+        __import__(name)
+    except ImportError:
+        return False
+    return True
+
+
+def get_decoder(name=None):
+    """
+    Get a function decoding UTF-8 JSON bytes
+
+    With no name, the fastest installed decoder is used. A named decoder that
+    is not installed falls back to the standard library with a warning.
+    """
+    if name is None:
+        name = next(n for n in PREFERENCE if available(n))
+    elif name not in DECODERS:
+        raise ValueError('Unknown JSON decoder: %s' % name)
+    elif not available(name):
+        logger.warning('JSON decoder %s is not installed, using json', name)
+        name = 'json'
+
+    logger.debug('Using JSON decoder: %s', name)
+    return DECODERS[name]
@@ -0,0 +1,271 @@
+"""
+Local, incrementally updated store of machine events and Lustre downtimes
+
+Answers "was host X (or filesystem Y) down at time T?" from an index instead
+of re-posting date ranges to Lora:
+
+    >>> store = machine_event_store(session, path='events.json')
+    >>> store.update('2016-01-01', '2016-09-01')
+    >>> store.at('cab', '2016-08-04 10:00:00')
+    [{'host': 'cab', 'start': ..., 'end': ..., ...}]
+
+Only the parts of a requested range not fetched before are requested.
+"""
+
+import bisect
+import datetime
+import json
+import logging
+
+from lora.util import normalize_timestamp
+
+logger = logging.getLogger(__file__)
+
+# Stand-in end for events still in progress
+OPEN_END = '9999-12-31 23:59:59'
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class IntervalIndex(object):
+    """
+    Intervals of one key kept sorted by start
+
+    Knowing the longest interval bounds how far before a query an
+    overlapping interval can start, so overlap queries are two binary
+    searches plus a scan of the candidates between them. Intervals longer
+    than long_after seconds and intervals without an end are few and kept
+    aside, so that one multi-week outage does not widen every scan.
+    """
+
+    def __init__(self, long_after=7 * 86400):
+        self.long_after = long_after
+        self.starts = []
+        self.intervals = []
+        self.longest = 0
+        self.long = []
+
+    def add(self, start, end, item):
+        if end - start > self.long_after:
+            self.long.append((start, end, item))
+            return
+        i = bisect.bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.intervals.insert(i, (start, end, item))
+        self.longest = max(self.longest, end - start)
+
+    def remove(self, start, end, item):
+        """
+        Remove an item added with add()
+        """
+        if end - start > self.long_after:
+            self.long = [entry for entry in self.long if entry[2] is not item]
+            return
+        lo = bisect.bisect_left(self.starts, start)
+        hi = bisect.bisect_right(self.starts, start)
+        for i in range(lo, hi):
+            if self.intervals[i][2] is item:
+                del self.starts[i]
+                del self.intervals[i]
+                break
+        if end - start >= self.longest:
+            self.longest = max([e - s for s, e, _ in self.intervals] or [0])
+
+    def overlapping(self, start, end):
+        """
+        Items whose interval overlaps [start, end]
+        """
+        hi = bisect.bisect_right(self.starts, end)
+        lo = bisect.bisect_left(self.starts, start - self.longest)
+        items = [item for s, e, item in self.intervals[lo:hi] if e >= start]
+        items.extend(item for s, e, item in self.long if s <= end and e >= start)
+        return items
+
+    def __iter__(self):
+        return iter(self.intervals + self.long)
+
+
+def _seconds(timestamp):
+    """
+    Seconds since the epoch of a normalized timestamp, or infinity for an open end
+    """
+    if timestamp is None or timestamp == OPEN_END:
+        return float('inf')
+    fmt = '%Y-%m-%d %H:%M:%S' if ' ' in timestamp else '%Y-%m-%d'
+    moment = datetime.datetime.strptime(timestamp[:19], fmt)
+    return (moment - EPOCH).total_seconds()
+
+
+def _cut(ranges, at):
+    # Drop the parts of ranges from at onwards
+    if at is None:
+        return ranges
+    return [(start, min(end, at)) for start, end in ranges if start < at]
+
+
+def _merge(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class EventStore(object):
+    """
+    Events indexed by key (host or filesystem), filled on demand by a fetch(start, end) callable
+
+    fetch returns the list of events in a date range; each event needs the
+    key_field and start/end fields. An event is identified by its id_field,
+    if given, or else by its key and start; a newer copy of an event replaces
+    the stored one. The ranges already fetched are remembered so update()
+    only fetches the gaps, except that everything from the start of the
+    earliest event still in progress is fetched again, to learn its end.
+    Events started more than max_open_age seconds ago and still without an
+    end are taken as never to be closed and no longer cause refetches.
+    """
+
+    def __init__(self, fetch, key_field, start_field='start', end_field='end', id_field=None, path=None,
+                 max_open_age=30 * 86400):
+        self.fetch = fetch
+        self.key_field = key_field
+        self.start_field = start_field
+        self.end_field = end_field
+        self.id_field = id_field
+        self.path = path
+        self.max_open_age = max_open_age
+
+        self.covered = []
+        self._index = {}
+        # identity -> (key, start, end, event) of every stored event
+        self._events = {}
+        if path is not None:
+            try:
+                self.load(path)
+            except (IOError, OSError):
+                pass
+
+    def _identity(self, event):
+        if self.id_field is not None and event.get(self.id_field) is not None:
+            return event[self.id_field]
+        return (event.get(self.key_field), normalize_timestamp(event.get(self.start_field)))
+
+    def add(self, events):
+        """
+        Index events, replacing stored copies that differ; returns how many were new or changed
+        """
+        added = 0
+        for event in events:
+            identity = self._identity(event)
+            stored = self._events.get(identity)
+            if stored is not None:
+                if stored[3] == event:
+                    continue
+                self._index[stored[0]].remove(stored[1], stored[2], stored[3])
+            start = _seconds(normalize_timestamp(event.get(self.start_field)))
+            end = _seconds(normalize_timestamp(event.get(self.end_field)))
+            key = event.get(self.key_field)
+            self._index.setdefault(key, IntervalIndex()).add(start, end, event)
+            self._events[identity] = (key, start, end, event)
+            added += 1
+        return added
+
+    def _open_since(self):
+        """
+        The start of the earliest event still in progress and not older than max_open_age, or None
+        """
+        oldest = datetime.datetime.now() - datetime.timedelta(seconds=self.max_open_age)
+        oldest = (oldest - EPOCH).total_seconds()
+        starts = [normalize_timestamp(e.get(self.start_field))
+                  for _, start, end, e in self._events.values() if end == float('inf') and start >= oldest]
+        return min(starts) if starts else None
+
+    def missing(self, start, end):
+        """
+        The parts of [start, end] not fetched yet
+        """
+        gaps = []
+        cursor = start
+        for s, e in self.covered:
+            if e < cursor:
+                continue
+            if s > end:
+                break
+            if s > cursor:
+                gaps.append((cursor, s))
+            cursor = max(cursor, e)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def update(self, start, end):
+        """
+        Fetch the events of [start, end] not fetched before, returning how many were new
+        """
+        start, end = normalize_timestamp(start), normalize_timestamp(end)
+        added = 0
+        for gap_start, gap_end in self.missing(start, end):
+            logger.info('Fetching events from %s to %s', gap_start, gap_end)
+            added += self.add(self.fetch(gap_start, gap_end))
+            self.covered = _merge(self.covered + [(gap_start, gap_end)])
+        self.covered = _cut(self.covered, self._open_since())
+        if self.path is not None:
+            self.save(self.path)
+        return added
+
+    def overlapping(self, key, start, end):
+        """
+        Events for key overlapping [start, end]
+        """
+        index = self._index.get(key)
+        if index is None:
+            return []
+        return index.overlapping(_seconds(normalize_timestamp(start)), _seconds(normalize_timestamp(end)))
+
+    def at(self, key, when):
+        """
+        Events for key in progress at a point in time
+        """
+        return self.overlapping(key, when, when)
+
+    @property
+    def keys(self):
+        return sorted(k for k in self._index if k is not None)
+
+    def save(self, path):
+        events = [event for _, _, _, event in self._events.values()]
+        with open(path, 'w') as f:
+            json.dump({'covered': self.covered, 'events': events}, f)
+
+    def load(self, path):
+        with open(path) as f:
+            data = json.load(f)
+        self.add(data['events'])
+        covered = _merge((normalize_timestamp(s), normalize_timestamp(e)) for s, e in data['covered'])
+        self.covered = _cut(covered, self._open_since())
+
+
+def machine_event_store(lora_session, eventType='calendar', eventArgs=None, path=None):
+    """
+    An EventStore of getMachineEvents() results, keyed by host
+    """
+    def fetch(start, end):
+        args = dict(eventArgs or {'category': 'all'})
+        args.update({'startDate': start, 'endDate': end})
+        return lora_session.getMachineEvents(eventType, args)['output']
+
+    return EventStore(fetch, 'host', path=path)
+
+
+def lustre_downtime_store(lora_session, lustreArgs=None, path=None):
+    """
+    An EventStore of getLustreDowntime() results, keyed by filesystem
+    """
+    def fetch(start, end):
+        args = dict(lustreArgs or {})
+        args.update({'startDate': start, 'endDate': end})
+        return lora_session.getLustreDowntime(args)['output']
+
+    return EventStore(fetch, 'filesystem', path=path)
@@ -0,0 +1,108 @@
+"""
+Query the CZ and RZ Lora instances together
+"""
+
+import logging
+
+from lora import LoraSession, RZLoraSession
+from lora.models import Record
+from lora.parallel import fan_out_iter
+
+logger = logging.getLogger(__file__)
+
+# Key added to each merged record naming the zone it came from
+ZONE_FIELD = 'Zone'
+
+
+def _tagged(item, zone):
+    """
+    A copy of a dict or record tagged with its zone; other items are returned as is
+    """
+    if isinstance(item, dict):
+        item = dict(item)
+    elif isinstance(item, Record):
+        item = item.from_dict(item.as_dict())
+    else:
+        return item
+    item[ZONE_FIELD] = zone
+    return item
+
+
+class FederatedSession(object):
+    """
+    Holds one logged in session per zone and issues the same call to all of them concurrently
+
+    Any LoraSession method can be called on a FederatedSession and returns a
+    dict of zone -> response for the zones that answered, and a dict of zone
+    -> exception for those that did not:
+
+        >>> zones = FederatedSession()
+        >>> zones.login()
+        >>> responses, errors = zones.getAllMachineLoads()
+        >>> responses
+        {'cz': {...}, 'rz': {...}}
+    """
+
+    def __init__(self, sessions=None):
+        if sessions is None:
+            sessions = {'cz': LoraSession(), 'rz': RZLoraSession()}
+        self.sessions = sessions
+
+    def login(self, username=None):
+        """
+        Login to every zone in turn, since each prompts for its own token
+        """
+        return dict((zone, session.login(username)) for zone, session in sorted(self.sessions.items()))
+
+    def call(self, method, *args, **kwargs):
+        """
+        Call a LoraSession method on every zone concurrently
+
+        One zone being down does not lose the others' answers: returns a dict
+        of zone -> response and a dict of zone -> exception raised.
+        """
+        def call_zone(zone):
+            return getattr(self.sessions[zone], method)(*args, **kwargs)
+
+        responses = {}
+        errors = {}
+        for zone, future in fan_out_iter(call_zone, self.sessions, len(self.sessions)):
+            error = future.exception()
+            if error is None:
+                responses[zone] = future.result()
+            else:
+                logger.warning('%s failed on %s: %s', method, zone, error)
+                errors[zone] = error
+        return responses, errors
+
+    def merged(self, method, key, *args, **kwargs):
+        """
+        Call a method on every zone and combine data['output'][key] from each
+
+        Lists are concatenated and dicts are keyed by (zone, key); copies of
+        dict records are tagged with their zone under ZONE_FIELD, leaving the
+        responses untouched. Returns the combined data, or None if no zone
+        answered, and the dict of zone -> exception from call().
+        """
+        results, errors = self.call(method, *args, **kwargs)
+
+        combined = None
+        for zone, data in sorted(results.items()):
+            items = data['output'][key]
+            if isinstance(items, dict):
+                combined = {} if combined is None else combined
+                for name, item in items.items():
+                    combined[(zone, name)] = _tagged(item, zone)
+            else:
+                combined = [] if combined is None else combined
+                combined.extend(_tagged(item, zone) for item in items)
+        return combined, errors
+
+    def __getattr__(self, name):
+        if name.startswith('_') or not callable(getattr(LoraSession, name, None)):
+            raise AttributeError(name)
+
+        def method(*args, **kwargs):
+            return self.call(name, *args, **kwargs)
+        method.__name__ = name
+        return method
@@ -0,0 +1,129 @@
+"""
+Local index of Lora group membership
+
+Answers isUserInGroup() style questions from memory instead of making a
+round trip to Lora for each check.
+"""
+
+import logging
+import threading
+import time
+
+from lora.parallel import DEFAULT_MAX_WORKERS, fan_out
+from lora.tracing import span
+
+logger = logging.getLogger(__file__)
+
+
+class GroupIndex(object):
+    """
+    Inverted index of user -> groups and group -> users
+
+    The index is built from getAllGroups() plus getGroupInfo() for each group,
+    fetched concurrently. Call refresh() to rebuild it, or start() to rebuild
+    it every refresh_interval seconds in a background thread.
+    """
+
+    def __init__(self, lora_session, refresh_interval=300, max_workers=DEFAULT_MAX_WORKERS):
+        self.session = lora_session
+        self.refresh_interval = refresh_interval
+        self.max_workers = max_workers
+
+        self.last_refresh = None
+        self.last_error = None
+
+        self._users_by_group = {}
+        self._groups_by_user = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        """
+        Rebuild the index from Lora
+
+        The new maps are swapped in only once they are complete, so readers
+        never see a partially built index.
+        """
+        with span(self.session, 'GroupIndex.refresh'):
+            groups = self.session.getAllGroups()['output']['groups']
+            infos = fan_out(self.session.getGroupInfo, groups, self.max_workers)
+
+        users_by_group = {}
+        groups_by_user = {}
+        for group, info in infos.items():
+            members = frozenset(info['output'].get('members', ()))
+            users_by_group[group] = members
+            for user in members:
+                groups_by_user.setdefault(user, set()).add(group)
+
+        self._users_by_group = users_by_group
+        self._groups_by_user = dict((u, frozenset(g)) for u, g in groups_by_user.items())
+        self.last_refresh = time.time()
+        self.last_error = None
+        logger.info('Indexed %d groups and %d users', len(users_by_group), len(groups_by_user))
+
+    def start(self):
+        """
+        Refresh the index now and then every refresh_interval seconds
+        """
+        if self._thread is not None:
+            return
+        self.refresh()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='lora-group-index')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the background refresh thread
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the previous index; staleness is visible via age
+                logger.warning('Failed to refresh group index: %s', e)
+                self.last_error = e
+
+    @property
+    def age(self):
+        """
+        Seconds since the last successful refresh, or None if never refreshed
+        """
+        if self.last_refresh is None:
+            return None
+        return time.time() - self.last_refresh
+
+    def is_stale(self, max_age=None):
+        """
+        True if the index is older than max_age (default: twice the refresh interval)
+        """
+        if max_age is None:
+            max_age = 2 * self.refresh_interval
+        age = self.age
+        return age is None or age > max_age
+
+    def isUserInGroup(self, group, username):
+        """
+        Check if user is a member of a group
+        """
+        return username in self._users_by_group.get(group, ())
+
+    def getUserGroups(self, username):
+        """
+        Get the set of groups a user belongs to
+        """
+        return self._groups_by_user.get(username, frozenset())
+
+    def getGroupMembers(self, group):
+        """
+        Get the set of users in a group
+        """
+        return self._users_by_group.get(group, frozenset())
@@ -0,0 +1,163 @@
+"""
+Hedged GET requests to cut tail latency
+
+Most small calls (getHostInfo, getUserInfo, ...) answer quickly, but now and
+then one stalls on a slow backend. With a Hedger set on a session, a GET
+still unanswered after a high percentile of recent latencies is sent a
+second time and whichever copy answers first is used:
+
+    >>> session.hedger = Hedger(percentile=95, budget=0.05)
+    >>> session.getHostInfo('cab')
+
+Only GETs are hedged, since sending a request twice must be harmless.
+Latencies are tracked per endpoint (the URL path, without the query), so a
+slow listing does not raise the threshold of quick lookups or the other way
+round. The budget caps hedges to a fraction of all requests so that a slow
+backend is not swamped with duplicates.
+"""
+
+import collections
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from lora.tracing import clock
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:  # Python 2
+    from urlparse import urlsplit
+
+logger = logging.getLogger(__file__)
+
+
+def _close(response):
+    close = getattr(response, 'close', None)
+    if close is not None:
+        close()
+
+
+class Hedger(object):
+    """
+    Sends a second copy of slow GETs and uses whichever answers first
+
+    Hedging of an endpoint starts once min_samples of its latencies have been
+    seen; a request is hedged after the given percentile of the endpoint's
+    last window latencies, but never sooner than min_delay seconds. Windows
+    are kept for the max_endpoints most recently used endpoints. Every
+    request earns budget tokens (up to burst) and every hedge spends one, so
+    hedges stay around budget of all requests.
+    """
+
+    def __init__(self, percentile=95, window=500, min_samples=50, min_delay=0.01,
+                 budget=0.05, burst=10, max_workers=32, max_endpoints=1000):
+        self.percentile = percentile
+        self.window = window
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.budget = budget
+        self.burst = burst
+        self.max_endpoints = max_endpoints
+
+        # endpoint -> its recent latencies, least recently used first
+        self.latencies = collections.OrderedDict()
+        self.tokens = 0.0
+        self.hedged = 0
+        self.won = 0
+
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    @staticmethod
+    def endpoint(url):
+        """
+        The key latencies of url are tracked under: its path, without the query
+        """
+        return urlsplit(url).path
+
+    def observe(self, endpoint, latency):
+        with self._lock:
+            samples = self.latencies.pop(endpoint, None)
+            if samples is None:
+                samples = collections.deque(maxlen=self.window)
+                while len(self.latencies) >= self.max_endpoints:
+                    self.latencies.popitem(last=False)
+            samples.append(latency)
+            self.latencies[endpoint] = samples
+
+    def threshold(self, endpoint):
+        """
+        Seconds to wait for an answer before hedging, or None while too few latencies are known
+        """
+        with self._lock:
+            samples = sorted(self.latencies.get(endpoint, ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * self.percentile / 100.0))
+        return max(self.min_delay, samples[index])
+
+    def _earn(self):
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + self.budget)
+
+    def _spend(self):
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            self.hedged += 1
+            return True
+
+    def request(self, send, method, url, **kwargs):
+        """
+        Call send(method, url, **kwargs), hedging it if it is slow
+
+        Both copies are streamed: the copy that loses is closed as soon as
+        its headers arrive instead of downloading its body. A copy already
+        past that point cannot be stopped and finishes in the background.
+        """
+        stream = kwargs.pop('stream', False)
+        endpoint = self.endpoint(url)
+        cancelled = threading.Event()
+
+        def attempt():
+            start = clock()
+            response = send(method, url, stream=True, **kwargs)
+            if cancelled.is_set():
+                self.observe(endpoint, clock() - start)
+                _close(response)
+                return response
+            if not stream:
+                # Read the body so that a stalled download counts as a slow answer
+                response.content
+            self.observe(endpoint, clock() - start)
+            return response
+
+        self._earn()
+        delay = self.threshold(endpoint)
+        if delay is None:
+            return attempt()
+
+        first = self._pool.submit(attempt)
+        done, _ = wait([first], timeout=delay)
+        if done or not self._spend():
+            return first.result()
+
+        logger.debug('Hedging %s %s after %.3f seconds', method, url, delay)
+        second = self._pool.submit(attempt)
+        pending = set([first, second])
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    cancelled.set()
+                    if future is second:
+                        with self._lock:
+                            self.won += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def close(self):
+        self._pool.shutdown(wait=False)
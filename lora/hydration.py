@@ -0,0 +1,91 @@
+"""
+Cached job details, refetched only when a job changes
+
+Job list views need getJobDetails() (and often getJobSteps()) for every
+visible job, but most jobs look the same from one refresh to the next. The
+hydrator compares a few fields of each job in the latest queue snapshot with
+those seen when its details were fetched, and only refetches what changed.
+"""
+
+import logging
+import threading
+
+from lora.jobs import JOB_HOST_FIELD, JOB_ID_FIELD
+from lora.parallel import DEFAULT_MAX_WORKERS, fan_out
+from lora.tracing import span
+
+logger = logging.getLogger(__file__)
+
+# Queue fields whose change means a job's details need to be fetched again
+FINGERPRINT_FIELDS = ('State', 'Nodes', 'StartTime', 'EndTime', 'TimeLimit', 'Reason')
+
+
+def fingerprint(job):
+    return tuple(job.get(field) for field in FINGERPRINT_FIELDS)
+
+
+class JobHydrator(object):
+    """
+    Keeps getJobDetails() (and optionally getJobSteps()) results per (host, jobid)
+
+    The queue snapshot comes from session.jobs(), so a getAllJobDetails()
+    listing fetched within snapshot_age seconds is reused.
+    """
+
+    def __init__(self, lora_session, steps=True, snapshot_age=30, max_workers=DEFAULT_MAX_WORKERS):
+        self.session = lora_session
+        self.steps = steps
+        self.snapshot_age = snapshot_age
+        self.max_workers = max_workers
+
+        self.cache = {}
+        self._lock = threading.Lock()
+
+    def _fetch(self, pair):
+        host, jobid = pair
+        details = self.session.getJobDetails(host, jobid)
+        steps = self.session.getJobSteps(host, jobid) if self.steps else None
+        return details, steps
+
+    def hydrate(self, pairs):
+        """
+        Get (details, steps) for each (host, jobid) pair
+
+        Jobs whose fingerprint in the queue snapshot is unchanged are served
+        from the cache; the rest are fetched concurrently. Leaving the queue
+        counts as a change: a job is fetched once more when it disappears
+        from the snapshot, and its entry is then marked gone (a fingerprint
+        of None) so it is not fetched again. Entries for jobs neither queued
+        nor requested are dropped.
+        """
+        pairs = list(pairs)
+        snapshot = dict(((job.get(JOB_HOST_FIELD), str(job.get(JOB_ID_FIELD))), fingerprint(job))
+                        for job in self.session.jobs(max_age=self.snapshot_age))
+
+        results = {}
+        misses = []
+        with self._lock:
+            for pair in pairs:
+                key = (pair[0], str(pair[1]))
+                current = snapshot.get(key)
+                cached = self.cache.get(key)
+                if cached is not None and cached[0] == current:
+                    results[pair] = cached[1]
+                else:
+                    misses.append(pair)
+
+        logger.debug('Hydrating %d jobs: %d cached, %d to fetch', len(pairs), len(results), len(misses))
+        with span(self.session, 'JobHydrator.hydrate', misses=len(misses)):
+            fetched = fan_out(self._fetch, misses, self.max_workers)
+
+        with self._lock:
+            for pair, value in fetched.items():
+                key = (pair[0], str(pair[1]))
+                self.cache[key] = (snapshot.get(key), value)
+                results[pair] = value
+
+            keep = set(snapshot) | set((p[0], str(p[1])) for p in pairs)
+            for key in [k for k in self.cache if k not in keep]:
+                del self.cache[key]
+
+        return results
@@ -0,0 +1,356 @@
+"""
+Helpers for tracking batches of jobs
+"""
+
+import datetime
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from lora.parallel import DEFAULT_MAX_WORKERS, fan_out, fan_out_iter
+from lora.tracing import span
+from lora.util import parse_limit
+
+logger = logging.getLogger(__file__)
+
+# Field names used in job records returned by the /queue endpoints
+JOB_HOST_FIELD = 'Host'
+JOB_ID_FIELD = 'JobID'
+JOB_STATE_FIELD = 'State'
+JOB_USER_FIELD = 'User'
+JOB_BANK_FIELD = 'Bank'
+JOB_END_FIELD = 'EndTime'
+
+# Jobs in these states are finished even if still listed in the queue
+TERMINAL_STATES = frozenset([
+    'BOOT_FAIL', 'CANCELLED', 'COMPLETED', 'DEADLINE', 'FAILED',
+    'NODE_FAIL', 'OUT_OF_MEMORY', 'PREEMPTED', 'TIMEOUT',
+])
+
+SACCT_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Field of the getHostJobLimits() output holding the maximum queued jobs per user
+MAX_SUBMIT_FIELD = 'max_submit'
+
+
+class SubmitError(RuntimeError):
+    """
+    A job was not submitted, so it has no job id
+    """
+
+
+class JobWaiter(object):
+    """
+    Wait for many jobs by polling each involved host's queue once per cycle
+
+    Every (host, jobid) pair gets a Future that resolves to the job's final
+    record: the last queue entry if the job reached a terminal state while
+    still listed, otherwise the output of getSacctJobDetails() once it has
+    left the queue. A job just submitted may not be listed yet, so a job
+    missing from the queue only counts as gone once it has been listed
+    before or grace seconds have passed.
+    """
+
+    def __init__(self, lora_session, pairs, max_workers=DEFAULT_MAX_WORKERS, grace=120):
+        self.session = lora_session
+        self.max_workers = max_workers
+        self.grace = grace
+        self.started = datetime.datetime.now()
+
+        self.futures = {}
+        self._seen = set()
+        self._pending = {}
+        for host, jobid in pairs:
+            self.futures[(host, jobid)] = Future()
+            self._pending.setdefault(host, {})[str(jobid)] = (host, jobid)
+
+    @property
+    def pending(self):
+        """
+        The (host, jobid) pairs that have not finished yet
+        """
+        return set(pair for jobs in self._pending.values() for pair in jobs.values())
+
+    def poll(self):
+        """
+        Run one polling cycle, resolving the futures of any finished jobs
+
+        A host whose queue cannot be listed is skipped for this cycle; its
+        jobs stay pending and are polled again next time. Returns the number
+        of jobs still pending.
+        """
+        hosts = [host for host, jobs in self._pending.items() if jobs]
+        queues = {}
+        with span(self.session, 'JobWaiter.poll', hosts=len(hosts)):
+            for host, future in fan_out_iter(self.session.getAllJobDetailsForHost, hosts, self.max_workers):
+                error = future.exception()
+                if error is not None:
+                    logger.warning('Failed to list the queue of %s, retrying next poll: %s', host, error)
+                    continue
+                queues[host] = future.result()
+
+        in_grace = datetime.datetime.now() - self.started < datetime.timedelta(seconds=self.grace)
+        vanished = []
+        for host in queues:
+            queued = dict((str(j[JOB_ID_FIELD]), j) for j in queues[host]['output']['jobs'])
+            waiting = self._pending[host]
+            for jobid in set(waiting) - set(queued):
+                if in_grace and (host, jobid) not in self._seen:
+                    continue
+                vanished.append(waiting.pop(jobid))
+            for jobid in set(waiting) & set(queued):
+                self._seen.add((host, jobid))
+                job = queued[jobid]
+                if job.get(JOB_STATE_FIELD) in TERMINAL_STATES:
+                    self.futures[waiting.pop(jobid)].set_result(job)
+
+        if vanished:
+            fan_out(self._resolve_vanished, vanished, self.max_workers)
+
+        remaining = sum(len(jobs) for jobs in self._pending.values())
+        logger.debug('%d jobs finished, %d pending', len(self.futures) - remaining, remaining)
+        return remaining
+
+    def _resolve_vanished(self, pair):
+        host, jobid = pair
+        start = self.started - datetime.timedelta(days=1)
+        end = datetime.datetime.now() + datetime.timedelta(days=1)
+        future = self.futures[pair]
+        try:
+            details = self.session.getSacctJobDetails(host, jobid,
+                                                      start.strftime(SACCT_DATE_FORMAT),
+                                                      end.strftime(SACCT_DATE_FORMAT))
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(details['output'])
+
+    def wait(self, timeout=None, poll_interval=30):
+        """
+        Poll until every job has finished or timeout seconds have passed
+
+        Returns the set of (host, jobid) pairs still pending.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while self.poll():
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                time.sleep(min(poll_interval, remaining))
+            else:
+                time.sleep(poll_interval)
+        return self.pending
+
+
+def wait_for_jobs(lora_session, pairs, timeout=None, poll_interval=30, callback=None, grace=120):
+    """
+    Wait for a batch of (host, jobid) pairs to finish
+
+    If given, callback(host, jobid, future) is called as each job finishes.
+    Returns a dict mapping each pair to a Future holding its final record;
+    futures of jobs that did not finish within timeout are left pending.
+    """
+    waiter = JobWaiter(lora_session, pairs, grace=grace)
+    if callback is not None:
+        for (host, jobid), future in waiter.futures.items():
+            future.add_done_callback(lambda f, h=host, j=jobid: callback(h, j, f))
+    waiter.wait(timeout, poll_interval)
+    return waiter.futures
+
+
+class SubmitPipeline(object):
+    """
+    Submit jobs concurrently with at most max_per_host submissions in flight per host
+
+    submit() returns a Future resolving to the new job id. A job may depend on
+    earlier submissions; it is submitted once their ids are known, with the
+    ids passed in the dependency_option (Slurm "afterok:id1:id2" syntax).
+
+    submitJob() is never retried: a failed POST may still have created the
+    job, so its Future carries the exception instead. A host's max_submit job
+    limit caps the user's queued and running jobs there: jobs over the limit
+    are held back, and the user's jobs on the host (getUserJobsForHost) are
+    counted again every poll_interval seconds to release them as others end.
+    """
+
+    dependency_option = 'dependency'
+
+    def __init__(self, lora_session, max_per_host=4, max_workers=DEFAULT_MAX_WORKERS, limits=None,
+                 poll_interval=30, username='ME'):
+        self.session = lora_session
+        self.max_per_host = max_per_host
+        self.limits = {} if limits is None else limits
+        self.poll_interval = poll_interval
+        self.username = username
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._queued = {}
+        self._inflight = {}
+        self._active = {}
+        self._pollers = {}
+        self._closed = False
+        self._futures = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def shutdown(self, wait=True):
+        """
+        Stop the pipeline, by default after every queued job has been resolved
+
+        Without waiting, jobs still held back fail with SubmitError.
+        """
+        if wait:
+            # Dependent jobs are only queued once their dependencies finish
+            for future in list(self._futures):
+                future.exception()
+
+        with self._lock:
+            self._closed = True
+            for timer in self._pollers.values():
+                timer.cancel()
+            self._pollers.clear()
+            held = [future for queue in self._queued.values() for _, future in queue]
+            self._queued.clear()
+        for future in held:
+            future.set_exception(SubmitError('Pipeline shut down before the job was submitted'))
+        self._pool.shutdown(wait=wait)
+
+    def submit(self, host, options, after=()):
+        """
+        Queue a job for submission, returning a Future for its job id
+        """
+        future = Future()
+        self._futures.append(future)
+        after = list(after)
+        if not after:
+            self._enqueue(host, options, future)
+            return future
+
+        remaining = [len(after)]
+
+        def on_dependency_done(_):
+            with self._lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            failed = [f for f in after if f.exception() is not None]
+            if failed:
+                future.set_exception(SubmitError('Dependency failed: %s' % failed[0].exception()))
+                return
+            ids = [str(f.result()) for f in after]
+            opts = dict(options)
+            opts[self.dependency_option] = 'afterok:' + ':'.join(ids)
+            self._enqueue(host, opts, future)
+
+        for dependency in after:
+            dependency.add_done_callback(on_dependency_done)
+        return future
+
+    def _count_active(self, host):
+        """
+        Count the user's jobs on a host that have not finished
+        """
+        jobs = self.session.getUserJobsForHost(host, self.username)['output']['jobs']
+        return sum(1 for job in jobs if job.get(JOB_STATE_FIELD) not in TERMINAL_STATES)
+
+    def _host_limit(self, host):
+        if host not in self.limits:
+            limits = self.session.getHostJobLimits(host)['output']
+            self.limits[host] = limits.get(MAX_SUBMIT_FIELD)
+        # Stored as a number, or None for no limit ('UNLIMITED' or 'INFINITE')
+        self.limits[host] = parse_limit(self.limits[host])
+        if self.limits[host] is not None and host not in self._active:
+            self._active[host] = self._count_active(host)
+        return self.limits[host]
+
+    def _enqueue(self, host, options, future):
+        try:
+            self._host_limit(host)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        with self._lock:
+            self._queued.setdefault(host, deque()).append((options, future))
+        self._dispatch(host)
+
+    def _dispatch(self, host):
+        failed = []
+        with self._lock:
+            queue = self._queued.get(host)
+            limit = self.limits.get(host)
+            while queue and self._inflight.get(host, 0) < self.max_per_host:
+                if limit is not None and self._inflight.get(host, 0) + self._active[host] >= limit:
+                    if host not in self._pollers and not self._closed:
+                        logger.info('Job limit of %s reached on %s, holding %d jobs', limit, host, len(queue))
+                        timer = threading.Timer(self.poll_interval, self._poll, (host,))
+                        timer.daemon = True
+                        self._pollers[host] = timer
+                        timer.start()
+                    break
+                options, future = queue.popleft()
+                try:
+                    self._pool.submit(self._run, host, options, future)
+                except Exception as e:
+                    # Resolve the job rather than leave shutdown() waiting on it forever
+                    failed.append((future, e))
+                    continue
+                self._inflight[host] = self._inflight.get(host, 0) + 1
+
+        for future, error in failed:
+            future.set_exception(error)
+
+    def _poll(self, host):
+        try:
+            active = self._count_active(host)
+        except Exception as e:
+            logger.warning('Could not count the jobs on %s, retrying: %s', host, e)
+            active = None
+        with self._lock:
+            self._pollers.pop(host, None)
+            if active is not None:
+                self._active[host] = active
+        self._dispatch(host)
+
+    def _run(self, host, options, future):
+        submitted = False
+        try:
+            response = self.session.submitJob(host, options)
+            submitted = True
+            future.set_result(response['output']['jobid'])
+        except Exception as e:
+            logger.warning('Submission to %s failed, not retrying: %s', host, e)
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight[host] -= 1
+                if submitted and host in self._active:
+                    self._active[host] += 1
+            self._dispatch(host)
+
+
+def submit_jobs(lora_session, specs, **kwargs):
+    """
+    Submit an iterable of job specs through a SubmitPipeline
+
+    Each spec is a dict with 'host' and 'options', and optionally a 'name' and
+    an 'after' list naming earlier specs it depends on. Returns the list of
+    job id Futures in spec order, once every submission has finished.
+    """
+    futures = []
+    named = {}
+    with SubmitPipeline(lora_session, **kwargs) as pipeline:
+        for spec in specs:
+            after = [named[name] for name in spec.get('after', ())]
+            future = pipeline.submit(spec['host'], spec.get('options', {}), after)
+            if 'name' in spec:
+                named[spec['name']] = future
+            futures.append(future)
+    return futures
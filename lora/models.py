@@ -0,0 +1,217 @@
+"""
+Compact record types for large Lora results
+
+Records store their common fields in __slots__ instead of a per-object dict,
+and intern categorical strings (hosts, users, states, ...) so that the many
+repeated values in a center-wide listing share a single string object.
+
+Records still behave like the decoded JSON dicts for reading: record['Host'],
+record.get('Host') and iteration over keys all use the original JSON keys.
+A JSON null in a slotted field is treated the same as a missing key.
+"""
+
+import sys
+
+try:
+    intern = sys.intern  # Python 3
+except AttributeError:
+    pass
+
+
+def _intern(value):
+    if type(value) is str:
+        return intern(value)
+    return value
+
+
+class Record(object):
+    """
+    Base class for records; subclasses list their (attribute, JSON key) fields
+    """
+    __slots__ = ('_extra',)
+
+    # Tuple of (attribute, JSON key) pairs stored in slots
+    fields = ()
+    # JSON keys whose string values are interned
+    categorical = ()
+
+    def __init__(self, **kwargs):
+        for attr, _ in self.fields:
+            setattr(self, attr, kwargs.pop(attr, None))
+        self._extra = kwargs or None
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a record from a decoded JSON object
+
+        Keys without a slot are kept, with interned keys, in a small side dict.
+        """
+        record = cls.__new__(cls)
+        data = dict(data)
+        for attr, key in cls.fields:
+            value = data.pop(key, None)
+            if key in cls.categorical:
+                value = _intern(value)
+            setattr(record, attr, value)
+        record._extra = dict((_intern(k), v) for k, v in data.items()) or None
+        return record
+
+    def as_dict(self):
+        """
+        Convert back to a plain dict with the original JSON keys
+        """
+        data = dict(self._extra or ())
+        for attr, key in self.fields:
+            value = getattr(self, attr)
+            if value is not None:
+                data[key] = value
+        return data
+
+    def keys(self):
+        return self.as_dict().keys()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __getitem__(self, key):
+        for attr, field in self.fields:
+            if field == key:
+                value = getattr(self, attr)
+                if value is None:
+                    break
+                return value
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        for attr, field in self.fields:
+            if field == key:
+                setattr(self, attr, value)
+                return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[_intern(key)] = value
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            other = other.as_dict()
+        return self.as_dict() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return self.as_dict()
+
+    def __setstate__(self, state):
+        other = self.from_dict(state)
+        for attr, _ in self.fields:
+            setattr(self, attr, getattr(other, attr))
+        self._extra = other._extra
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, self.as_dict())
+
+
+class Job(Record):
+    """
+    A job from the /queue endpoints
+    """
+    fields = (
+        ('host', 'Host'),
+        ('jobid', 'JobID'),
+        ('state', 'State'),
+        ('user', 'User'),
+        ('bank', 'Bank'),
+        ('partition', 'Partition'),
+        ('name', 'Name'),
+        ('nodes', 'Nodes'),
+        ('cores', 'Cores'),
+        ('time_limit', 'TimeLimit'),
+        ('submit_time', 'SubmitTime'),
+        ('start_time', 'StartTime'),
+        ('end_time', 'EndTime'),
+        ('reason', 'Reason'),
+    )
+    categorical = ('Host', 'State', 'User', 'Bank', 'Partition', 'Reason')
+    __slots__ = tuple(attr for attr, _ in fields)
+
+
+class Cluster(Record):
+    """
+    A cluster from the /status/clusters endpoint
+    """
+    fields = (
+        ('host', 'host'),
+        ('status', 'status'),
+        ('load', 'load'),
+        ('nodes', 'nodes'),
+        ('nodes_up', 'nodes_up'),
+        ('nodes_down', 'nodes_down'),
+    )
+    categorical = ('host', 'status')
+    __slots__ = tuple(attr for attr, _ in fields)
+
+
+class Bank(Record):
+    """
+    A bank from the /banks endpoint
+    """
+    fields = (
+        ('name', 'name'),
+        ('parent', 'parent'),
+        ('host', 'host'),
+        ('shares', 'shares'),
+        ('description', 'description'),
+    )
+    categorical = ('name', 'parent', 'host')
+    __slots__ = tuple(attr for attr, _ in fields)
+
+
+class User(Record):
+    """
+    A user from the /user?info=all endpoint
+    """
+    fields = (
+        ('username', 'username'),
+        ('uid', 'uid'),
+        ('name', 'name'),
+        ('email', 'email'),
+        ('oun', 'oun'),
+        ('org', 'org'),
+        ('shell', 'shell'),
+        ('home', 'home'),
+    )
+    categorical = ('org', 'shell')
+    __slots__ = tuple(attr for attr, _ in fields)
+
+
+def to_records(data, record_type):
+    """
+    Convert a list, or a dict of values, of decoded JSON objects to records
+
+    Lists are converted in place so each dict is freed as soon as its record
+    exists, keeping peak memory close to that of the decoded payload.
+    """
+    if isinstance(data, dict):
+        return dict((_intern(k), record_type.from_dict(v)) for k, v in data.items())
+    for i, item in enumerate(data):
+        data[i] = record_type.from_dict(item)
+    return data
@@ -0,0 +1,150 @@
+"""
+Helpers for issuing many Lora requests concurrently
+"""
+
+import logging
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from lora.deadlines import propagate
+
+logger = logging.getLogger(__file__)
+
+DEFAULT_MAX_WORKERS = 8
+
+# Marks the end of the keys in fan_out_iter()
+_DONE = object()
+
+
+def fan_out(func, keys, max_workers=DEFAULT_MAX_WORKERS, deadline=None):
+    """
+    Call func(key) for every key using a pool of threads
+
+    Returns a dict mapping each key to its result. The first exception raised
+    by func is re-raised once all calls have finished. The calls run under
+    the caller's deadline, shortened to deadline seconds if given.
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+    func = propagate(func, deadline)
+
+    workers = max(1, min(max_workers, len(keys)))
+    logger.debug('Fanning out %d calls over %d workers', len(keys), workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [(key, pool.submit(func, key)) for key in keys]
+
+    return dict((key, future.result()) for key, future in futures)
+
+
+def fan_out_iter(func, keys, max_workers=DEFAULT_MAX_WORKERS, timeout=None, deadline=None):
+    """
+    Call func(key) for every key using a pool of threads, yielding (key, future) as calls complete
+
+    At most twice max_workers calls are submitted at a time, the next key
+    being submitted as each call completes, so each step only looks at that
+    window however many keys there are. With a timeout, a call still running
+    timeout seconds after it started is yielded as a straggler whose future
+    is not done yet. Stragglers are not waited for: their threads finish in
+    the background. As with fan_out(), a deadline bounds the whole batch.
+    Calls not started yet when the generator is closed are cancelled.
+    """
+    keys = list(keys)
+    if not keys:
+        return
+    func = propagate(func, deadline)
+
+    started = {}
+
+    def run(key):
+        started[key] = time.time()
+        return func(key)
+
+    workers = max(1, min(max_workers, len(keys)))
+    window = 2 * workers
+    todo = iter(keys)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    futures = {}
+    pending = set()
+
+    def fill():
+        while len(pending) < window:
+            key = next(todo, _DONE)
+            if key is _DONE:
+                return
+            future = pool.submit(run, key)
+            futures[future] = key
+            pending.add(future)
+
+    try:
+        fill()
+        while pending:
+            wait_for = None
+            if timeout is not None:
+                expiries = [started[futures[f]] + timeout for f in pending if futures[f] in started]
+                wait_for = max(0, min(expiries) - time.time()) if expiries else timeout
+
+            done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            pending -= done
+            for future in done:
+                yield futures.pop(future), future
+
+            if timeout is not None:
+                now = time.time()
+                late = set(f for f in pending if now - started.get(futures[f], now) >= timeout)
+                pending -= late
+                for future in late:
+                    logger.warning('No result for %s after %s seconds', futures[future], timeout)
+                    yield futures.pop(future), future
+            fill()
+    finally:
+        # A consumer stopping early must not leave the remaining calls to run
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+
+# The session shipped to each worker process of process_map()
+_worker_session = None
+
+
+def _init_worker(lora_session):
+    global _worker_session
+    _worker_session = lora_session
+
+
+def _call_in_worker(task):
+    func, key = task
+    if isinstance(func, str):
+        return key, getattr(_worker_session, func)(key)
+    return key, func(_worker_session, key)
+
+
+def process_map(lora_session, func, keys, processes=None, chunksize=1):
+    """
+    Call func(session, key) for every key using a pool of processes
+
+    For work whose decoding or post-processing is CPU bound enough to be
+    held back by the GIL. The session is pickled (settings and cookies, no
+    connections) and sent to each worker once rather than with every call.
+    func is either the name of a LoraSession method called with the key, or
+    a module level function, so that it can be pickled too.
+
+    Returns a dict mapping each key to its result; the first exception
+    raised in a worker is re-raised.
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+
+    processes = max(1, min(processes or multiprocessing.cpu_count(), len(keys)))
+    logger.debug('Mapping %d calls over %d processes', len(keys), processes)
+    pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(lora_session,))
+    try:
+        results = pool.map(_call_in_worker, [(func, key) for key in keys], chunksize)
+    finally:
+        pool.close()
+        pool.join()
+
+    return dict(results)
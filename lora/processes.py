@@ -0,0 +1,135 @@
+"""
+Find and kill runaway processes across many users and hosts
+"""
+
+import logging
+import re
+from collections import namedtuple
+
+from lora.parallel import DEFAULT_MAX_WORKERS, fan_out
+from lora.tracing import span
+from lora.util import parse_duration
+
+logger = logging.getLogger(__file__)
+
+# Field names used in process records returned by the /processes endpoints
+PROC_HOST_FIELD = 'host'
+PROC_PID_FIELD = 'pid'
+PROC_USER_FIELD = 'user'
+PROC_CPU_FIELD = 'cputime'
+PROC_AGE_FIELD = 'etime'
+PROC_COMMAND_FIELD = 'command'
+
+# Outcome of killing one process; status is 'dry-run' when nothing was sent
+KillOutcome = namedtuple('KillOutcome', ['host', 'pid', 'status', 'error'])
+
+
+def _process_list(output, host=None):
+    """
+    Flatten a processes output, either a list or a dict of host -> list
+    """
+    if isinstance(output, dict):
+        processes = []
+        for h, procs in output.items():
+            processes.extend(_process_list(procs, h))
+        return processes
+    if host is not None:
+        for proc in output:
+            proc.setdefault(PROC_HOST_FIELD, host)
+    return output
+
+
+def collect(lora_session, users, hosts=None, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Get the processes of many users concurrently
+
+    Without hosts, getAllUserProcesses() is called once per user; otherwise
+    getUserProcessesForHost() is called for every (user, host) pair.
+    """
+    def call(key):
+        user, host = key
+        return lora_session.getUserProcessesForHost(host, user)
+
+    with span(lora_session, 'processes.collect'):
+        if hosts is None:
+            results = fan_out(lora_session.getAllUserProcesses, users, max_workers)
+            outputs = [(None, r['output']) for r in results.values()]
+        else:
+            keys = [(user, host) for user in users for host in hosts]
+            results = fan_out(call, keys, max_workers)
+            outputs = [(host, r['output']) for (_, host), r in results.items()]
+
+    processes = []
+    for host, output in outputs:
+        processes.extend(_process_list(output, host))
+    logger.info('Collected %d processes', len(processes))
+    return processes
+
+
+def select(processes, min_cpu=None, min_age=None, command=None, users=None):
+    """
+    Filter processes in a single pass
+
+    min_cpu and min_age are in seconds, command is a regular expression
+    searched for in the command line, and users restricts the owners.
+    """
+    pattern = re.compile(command) if command is not None else None
+    users = frozenset(users) if users is not None else None
+
+    selected = []
+    for proc in processes:
+        if users is not None and proc.get(PROC_USER_FIELD) not in users:
+            continue
+        if min_cpu is not None and parse_duration(proc.get(PROC_CPU_FIELD, 0)) < min_cpu:
+            continue
+        if min_age is not None and parse_duration(proc.get(PROC_AGE_FIELD, 0)) < min_age:
+            continue
+        if pattern is not None and not pattern.search(proc.get(PROC_COMMAND_FIELD, '')):
+            continue
+        selected.append(proc)
+    return selected
+
+
+def _pid_status(output, pid):
+    # A per-pid status from a killProcess() output keyed by pid, if it has one
+    if isinstance(output, dict):
+        for key in (pid, str(pid)):
+            if key in output:
+                return output[key]
+    return None
+
+
+def kill(lora_session, processes, batch_size=100, dry_run=False):
+    """
+    Kill processes using as few killProcess() calls as possible
+
+    Each POST names a single host and up to batch_size of its pids, since
+    killProcess() applies every pid to every host given. Returns a KillOutcome
+    per process; its status is the one reported for that pid when the output
+    is keyed by pid, otherwise the status of the whole POST.
+    """
+    pairs = sorted(set((p[PROC_HOST_FIELD], p[PROC_PID_FIELD]) for p in processes))
+    if dry_run:
+        return [KillOutcome(host, pid, 'dry-run', None) for host, pid in pairs]
+
+    by_host = {}
+    for host, pid in pairs:
+        by_host.setdefault(host, []).append(pid)
+
+    outcomes = []
+    for host in sorted(by_host):
+        pids = by_host[host]
+        for start in range(0, len(pids), batch_size):
+            batch = pids[start:start + batch_size]
+            try:
+                response = lora_session.killProcess([host], batch)
+            except Exception as e:
+                logger.warning('Failed to kill %d processes on %s: %s', len(batch), host, e)
+                outcomes.extend(KillOutcome(host, pid, None, e) for pid in batch)
+                continue
+            error = response.get('error') or None
+            output = response.get('output')
+            for pid in batch:
+                status = _pid_status(output, pid)
+                outcomes.append(KillOutcome(host, pid, status if status is not None else response.get('status'), error))
+    return outcomes
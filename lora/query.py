@@ -0,0 +1,145 @@
+"""
+Answer job queries from the narrowest Lora endpoint, or from a fresh cached superset
+"""
+
+import threading
+import time
+
+from lora.jobs import JOB_HOST_FIELD, JOB_STATE_FIELD, JOB_USER_FIELD
+
+# Query scopes, from the narrowest to the widest endpoint serving them:
+#   ('user_host', user, host)  getUserJobsForHost
+#   ('user', user)             getUserJobs
+#   ('host', host)             getAllJobDetailsForHost
+#   ('all',)                   getAllJobDetails
+
+
+class JobPlanner(object):
+    """
+    Plans job queries for a session
+
+    Every listing fetched is kept as a snapshot; a later query that a fresh
+    snapshot covers (such as one host's jobs when all jobs were fetched a few
+    seconds ago) is answered from it without a request. Snapshots are
+    dropped once older than max_age, or when a wider listing replaces them,
+    so large listings are not held for the life of the session.
+    """
+
+    def __init__(self, lora_session, max_age=30):
+        self.session = lora_session
+        self.max_age = max_age
+        self.snapshots = {}
+        self._lock = threading.Lock()
+        self._timer = None
+
+    @staticmethod
+    def scope(host=None, user=None):
+        """
+        The narrowest scope serving a query
+        """
+        if host is not None and user is not None:
+            return ('user_host', user, host)
+        if user is not None:
+            return ('user', user)
+        if host is not None:
+            return ('host', host)
+        return ('all',)
+
+    @staticmethod
+    def supersets(scope):
+        """
+        Scopes whose listings contain every job of scope, narrowest first
+
+        A listing for 'ME' can only answer queries for 'ME', since the
+        current user's name is not known locally.
+        """
+        kind = scope[0]
+        yield scope
+        if kind == 'user_host':
+            _, user, host = scope
+            yield ('user', user)
+            if user != 'ME':
+                yield ('host', host)
+        if kind != 'all' and scope[1:2] != ('ME',):
+            yield ('all',)
+
+    def fetch(self, scope):
+        """
+        Fetch the listing for a scope from Lora and keep it as a snapshot
+        """
+        kind = scope[0]
+        if kind == 'user_host':
+            data = self.session.getUserJobsForHost(scope[2], scope[1])
+        elif kind == 'user':
+            data = self.session.getUserJobs(scope[1])
+        elif kind == 'host':
+            data = self.session.getAllJobDetailsForHost(scope[1])
+        else:
+            data = self.session.getAllJobDetails()
+
+        jobs = data['output']['jobs']
+        with self._lock:
+            for other in list(self.snapshots):
+                if scope in self.supersets(other):
+                    del self.snapshots[other]
+            self.snapshots[scope] = (time.time(), jobs)
+            self._schedule_expiry()
+        return jobs
+
+    def expire(self, max_age=None):
+        """
+        Drop the snapshots older than max_age (default: the planner's)
+        """
+        max_age = self.max_age if max_age is None else max_age
+        now = time.time()
+        with self._lock:
+            for scope, (fetched, _) in list(self.snapshots.items()):
+                if now - fetched > max_age:
+                    del self.snapshots[scope]
+            self._timer = None
+            self._schedule_expiry()
+
+    def _schedule_expiry(self):
+        # Called with the lock held; one timer at a time drops snapshots as they go stale
+        if self._timer is not None or not self.snapshots:
+            return
+        oldest = min(fetched for fetched, _ in self.snapshots.values())
+        self._timer = threading.Timer(max(0, oldest + self.max_age - time.time()) + 0.1, self.expire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def cached(self, scope, max_age=None):
+        """
+        Get the jobs of the narrowest fresh snapshot covering scope, or None
+        """
+        max_age = self.max_age if max_age is None else max_age
+        now = time.time()
+        with self._lock:
+            for candidate in self.supersets(scope):
+                snapshot = self.snapshots.get(candidate)
+                if snapshot is not None and now - snapshot[0] <= max_age:
+                    return snapshot[1]
+        return None
+
+    def jobs(self, host=None, user=None, state=None, max_age=None):
+        """
+        Get the jobs matching host, user and state (a state or collection of states)
+        """
+        scope = self.scope(host, user)
+        jobs = self.cached(scope, max_age)
+        if jobs is None:
+            jobs = self.fetch(scope)
+
+        if isinstance(state, str):
+            state = (state,)
+        states = frozenset(state) if state is not None else None
+        user = None if user == 'ME' else user
+
+        def matches(job):
+            if host is not None and job.get(JOB_HOST_FIELD) != host:
+                return False
+            if user is not None and job.get(JOB_USER_FIELD) != user:
+                return False
+            return states is None or job.get(JOB_STATE_FIELD) in states
+
+        return [job for job in jobs if matches(job)]
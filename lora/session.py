@@ -0,0 +1,1133 @@
+import getpass
+import json
+import logging
+import requests
+
+from lora.batch import Batch
+from lora.deadlines import bound
+from lora.decoders import get_decoder
+from lora.models import Bank, Cluster, Job, User, to_records
+from lora.parallel import DEFAULT_MAX_WORKERS
+from lora.query import JobPlanner
+from lora.transports import get_transport
+from lora.util import open_private
+
+logger = logging.getLogger(__file__)
+
+__url_cache__ = {}
+
+# Default (connect, read) timeouts in seconds for every request
+DEFAULT_TIMEOUT = (10, 120)
+
+try:
+    input = raw_input  # Python 2
+except NameError:
+    pass
+
+
+class LoraSession(requests.Session):
+    domain = 'https://lc.llnl.gov'
+    login_prompt = 'Pin & Token: '
+    username_prompt = 'LC Username'
+    token_cookies = ('crowd.token_key', 'izcrowd.token_key')
+
+    def __init__(self, records=False, decoder=None, transport=None, timeout=DEFAULT_TIMEOUT):
+        super(LoraSession, self).__init__()
+
+        # (connect, read) timeouts for requests not given one, shrunk by any lora.deadlines deadline
+        self.timeout = timeout
+        # Return compact lora.models records instead of dicts for large listings
+        self.records = records
+        # JSON decoder name from lora.decoders; None picks the fastest installed
+        self.loads = get_decoder(decoder)
+        # A lora.tracing.Tracer to record the phases of every request, if set
+        self.tracer = None
+        # A lora.hedging.Hedger to resend slow GETs, if set
+        self.hedger = None
+        self.job_planner = JobPlanner(self)
+        # A lora.transports transport (or its name) used instead of requests for API calls
+        self.transport = get_transport(transport)
+
+        self.headers.update({
+            # Only accept UTF-8 encoded data
+            'Accept-Charset': 'utf-8',
+            # Always sending JSON
+            'Content-Type': "application/json",
+        })
+
+        self.login_url = '%s/dologin.cgi' % self.domain
+        self.base_url = '%s/lorenz/lora/lora.cgi' % self.domain
+
+    def build_url(self, *args, **kwargs):
+        """
+        Builds a new API url from scratch.
+
+        Adapted from: https://github.com/sigmavirus24/github3.py/blob/develop/github3/session.py
+        """
+        parts = [kwargs.get('base_url') or self.base_url]
+        parts.extend(args)
+        parts = [str(p) for p in parts]
+        key = tuple(parts)
+        logger.debug('Building a url from %s', key)
+        if key not in __url_cache__:
+            logger.debug('Missed the cache building the url')
+            __url_cache__[key] = '/'.join(parts)
+
+        url = __url_cache__[key]
+        logger.info('Built URL: %s', url)
+
+        return url
+
+    def request(self, method, url, *args, **kwargs):
+        """
+        Send a request, hedging it if the session has a hedger and the request is a GET
+
+        The timeout defaults to the session's and is shrunk to the time left
+        before the current deadline, if any.
+        """
+        kwargs['timeout'] = bound(kwargs.get('timeout', self.timeout))
+        if self.hedger is not None and method.upper() == 'GET' and not args:
+            return self.hedger.request(self._send, method, url, **kwargs)
+        return self._send(method, url, *args, **kwargs)
+
+    def _send(self, method, url, *args, **kwargs):
+        """
+        Send a request, recording its phases if the session has a tracer
+
+        API calls go through the session's transport if it has one; login,
+        which needs requests' authentication handling, never does.
+        """
+        if self.transport is not None and not args and 'auth' not in kwargs:
+            if self.tracer is None:
+                return self.transport.request(self, method, url, **kwargs)
+            start = self.tracer.now()
+            response = self.transport.request(self, method, url, **kwargs)
+            name = '%s %s' % (method, url.split(self.base_url, 1)[-1] or '/')
+            self.tracer.record(name, start, self.tracer.now(), args={'status': response.status_code})
+            return response
+
+        if self.tracer is None:
+            return super(LoraSession, self).request(method, url, *args, **kwargs)
+
+        tracer = self.tracer
+        name = '%s %s' % (method, url.split(self.base_url, 1)[-1] or '/')
+        stream = kwargs.get('stream', False)
+        # Stream so that the wait for headers and the body download can be timed apart
+        kwargs['stream'] = True
+        start = tracer.now()
+        response = super(LoraSession, self).request(method, url, *args, **kwargs)
+        first_byte = tracer.now()
+        if not stream:
+            tracer.record('time to first byte', start, first_byte)
+            size = len(response.content)
+            tracer.record('download', first_byte, tracer.now(), args={'bytes': size})
+        tracer.record(name, start, tracer.now(), args={'status': response.status_code})
+        return response
+
+    def __getstate__(self):
+        """
+        Pickle the settings and cookies but no connections, so a session can be sent to other processes
+
+        The tracer, hedger and the job planner's snapshots are not pickled, and the
+        transport is recreated with its default settings.
+        """
+        state = super(LoraSession, self).__getstate__()
+        state.update({
+            'records': self.records,
+            'timeout': self.timeout,
+            'loads': self.loads,
+            'transport': type(self.transport) if self.transport is not None else None,
+            'login_url': self.login_url,
+            'base_url': self.base_url,
+        })
+        return state
+
+    def __setstate__(self, state):
+        state = dict(state)
+        transport = state.pop('transport', None)
+        super(LoraSession, self).__setstate__(state)
+        self.tracer = None
+        self.hedger = None
+        self.job_planner = JobPlanner(self)
+        self.transport = transport() if transport is not None else None
+
+    def close(self):
+        super(LoraSession, self).close()
+        if self.transport is not None:
+            self.transport.close()
+
+    def decode(self, response):
+        """
+        Decode the JSON body of a response from its raw UTF-8 bytes
+        """
+        if self.tracer is None:
+            return self.loads(response.content)
+
+        start = self.tracer.now()
+        data = self.loads(response.content)
+        self.tracer.record('decode', start, self.tracer.now())
+        return data
+
+    def as_records(self, data, record_type, key=None):
+        """
+        Convert the output of a response to records if this session uses them
+
+        With a key, only data['output'][key] is converted.
+        """
+        if not self.records or not data.get('output'):
+            return data
+        if key is None:
+            data['output'] = to_records(data['output'], record_type)
+        else:
+            data['output'][key] = to_records(data['output'][key], record_type)
+        return data
+
+    def login(self, username=None, password=None):
+        """
+        Login to Lorenz with credentials
+
+        Raises a ConnectionError if the authentication failed for any reason
+        """
+        if username is None:
+            env_username = getpass.getuser()
+            user_prompt = "%s [%s]: " % (self.username_prompt, env_username)
+            username = input(user_prompt)
+
+            if username == '':
+                username = env_username
+
+        logger.debug('Username: %s', username)
+
+        if password is None:
+            password = getpass.getpass(self.login_prompt)
+
+        response = self.post(self.login_url, auth=(username, password))
+        logger.debug('Server response: %s', response.__dict__)
+
+        if not any(token in response.cookies for token in self.token_cookies):
+            raise requests.ConnectionError('Failed to authenticate')
+
+        return response
+
+    def batch(self, max_workers=DEFAULT_MAX_WORKERS, deadline=None):
+        """
+        Queue calls made through the returned lora.batch.Batch and run them concurrently
+
+        The calls run when the with block ends or when a result is first read.
+        """
+        return Batch(self, max_workers, deadline)
+
+    def use_daemon(self, path=None):
+        """
+        Send all requests through the local lora.daemon instead of directly to Lora
+
+        The daemon holds the login, so login() is not needed.
+        """
+        from lora.daemon import TOKEN_HEADER, read_daemon_file
+
+        daemon = read_daemon_file(path)
+        self.base_url = '%s/lorenz/lora/lora.cgi' % daemon['url']
+        self.headers[TOKEN_HEADER] = daemon['token']
+
+    def has_token(self):
+        """
+        Check whether the session holds an authentication token
+        """
+        return any(token in self.cookies for token in self.token_cookies)
+
+    def save_login(self, path):
+        """
+        Save the authentication cookies to a file readable only by the user
+        """
+        cookies = [{
+            'name': c.name,
+            'value': c.value,
+            'domain': c.domain,
+            'path': c.path,
+            'expires': c.expires,
+            'secure': c.secure,
+        } for c in self.cookies]
+        with open_private(path) as f:
+            json.dump(cookies, f)
+
+    def load_login(self, path):
+        """
+        Reuse the authentication cookies saved by save_login() instead of logging in
+
+        Returns True if an authentication token was loaded.
+        """
+        with open(path) as f:
+            cookies = json.load(f)
+        for cookie in cookies:
+            self.cookies.set(cookie.pop('name'), cookie.pop('value'), **cookie)
+        return self.has_token()
+
+    def getUserGroups(self, username='ME'):
+        """
+        Get list of all groups for a user
+
+        Lora: /user/:user/groups
+        """
+        response = self.get(self.build_url('user', username, 'groups'))
+        return self.decode(response)
+
+    def getAllGroups(self):
+        """
+        Get list of all groups
+
+        Lora: /groups
+        """
+        response = self.get(self.build_url('groups'))
+        return self.decode(response)
+
+    def getUserBanks(self, username='ME'):
+        """
+        Get list of all banks for a user
+
+        Lora: /user/:user/banks
+        """
+        response = self.get(self.build_url('user', username, 'banks'))
+        return self.decode(response)
+
+    def getAllBanks(self):
+        """
+        Get list of all banks
+
+        Lora: /banks
+        """
+        response = self.get(self.build_url('banks'))
+        return self.as_records(self.decode(response), Bank, 'banks')
+
+    def getUserBanksByHost(self, username='ME'):
+        """
+        Get dict of all banks for a user by host
+
+        Lora: /user/:user/bankhosts
+        """
+        response = self.get(self.build_url('user', username, 'bankhosts'))
+        return self.decode(response)
+
+    def getUserAccounts(self, username='ME'):
+        """
+        Get list of all accounts for a user
+
+        Lora: /user/:user/hosts
+        """
+        response = self.get(self.build_url('user', username, 'hosts'))
+        return self.decode(response)
+
+    def getUserClusters(self, username='ME'):
+        """
+        Get list of all compute-only clusters for a user
+
+        Lora: /user/:user/clusters?compute_only=1
+        """
+        payload = {'compute_only': '1'}
+        response = self.get(self.build_url('user', username, 'clusters'), params=payload)
+        return self.decode(response)
+
+    def getAllJobDetails(self):
+        """
+        Get list of all jobs with job details included
+
+        Lora: /queue
+        """
+        response = self.get(self.build_url('queue'))
+        return self.as_records(self.decode(response), Job, 'jobs')
+
+    def getAllJobCountsByUser(self):
+        """
+        Get dict of all jobs counts by user and all job counts by user for each host
+
+        Lora: /queue?filter=allJobs
+        """
+        payload = {'filter': 'allJobs'}
+        response = self.get(self.build_url('queue'), params=payload)
+        return self.decode(response)
+
+    def getAllJobDetailsForHost(self, host):
+        """
+        Get list of all jobs for a host
+
+        Lora: /queue/:host
+        """
+        response = self.get(self.build_url('queue', host))
+        return self.as_records(self.decode(response), Job, 'jobs')
+
+    def jobs(self, host=None, user=None, state=None, max_age=None):
+        """
+        Get jobs by host, user and state from the narrowest endpoint
+
+        Reuses any listing fetched by an earlier jobs() call within max_age
+        seconds (default 30) that covers the query. See lora.query.
+        """
+        return self.job_planner.jobs(host, user, state, max_age)
+
+    def getUserDefaultHost(self, username='ME'):
+        """
+        Get default host for a user
+
+        Lora: /user/:user/default/host
+        """
+        response = self.get(self.build_url('user', username, 'default', 'host'))
+        return self.decode(response)
+
+    def getGroupInfo(self, group):
+        """
+        Get information for a group
+
+        Lora: /group/:group
+        """
+        response = self.get(self.build_url('group', group))
+        return self.decode(response)
+
+    def getBankInfo(self, bank, username='ME'):
+        """
+        Get information for a bank
+
+        Lora: /user/:user/bank/:bank
+        """
+        response = self.get(self.build_url('user', username, 'bank', bank))
+        return self.decode(response)
+
+    def getAllClusters(self):
+        """
+        Get list of cluster
+
+        Lora: /clusters
+        """
+        response = self.get(self.build_url('clusters'))
+        return self.decode(response)
+
+    def getAllClustersMounts(self):
+        """
+        Get dict of cluster mounts by host
+
+        Lora: /clusters/mounts
+        """
+        response = self.get(self.build_url('clusters', 'mounts'))
+        return self.decode(response)
+
+    def getHostInfo(self, host):
+        """
+        Get information for a host
+
+        Lora: /host/:host
+        """
+        response = self.get(self.build_url('host', host))
+        return self.decode(response)
+
+    def getHostJobLimits(self, host):
+        """
+        Get job limits for a host
+
+        Lora: /cluster/:host/joblimits
+        """
+        response = self.get(self.build_url('cluster', host, 'joblimits'))
+        return self.decode(response)
+
+    def getHostDetails(self, host):
+        """
+        Get details for a host
+
+        Lora: /cluster/:host/details
+        """
+        response = self.get(self.build_url('cluster', host, 'details'))
+        return self.decode(response)
+
+    def getHostTopology(self, host):
+        """
+        Get topology for a host
+
+        Lora: /cluster/:host/topo
+        """
+        response = self.get(self.build_url('cluster', host, 'topo'))
+        return self.decode(response)
+
+    def getAllMachineLoads(self):
+        """
+        Get machine statuses
+
+        Lora: /status/clusters
+        """
+        response = self.get(self.build_url('status', 'clusters'))
+        return self.as_records(self.decode(response), Cluster, 'clusters')
+
+    def getAllClusterUtilizations(self):
+        """
+        Get cluster utilizations
+
+        Lora: /status/clusters/utilization/hourly2
+        """
+        response = self.get(self.build_url('status', 'clusters', 'utilization', 'hourly2'))
+        return self.decode(response)
+
+    def getAllLcOrganizations(self):
+        """
+        Get dict of LC organizations
+
+        Lora: /lc/organizations
+        """
+        response = self.get(self.build_url('lc', 'organizations'))
+        return self.decode(response)
+
+    def getAllCoreCoordinators(self):
+        """
+        Get dict of all core coordinators
+
+        Lora: /corecoordinators
+        """
+        response = self.get(self.build_url('corecoordinators'))
+        return self.decode(response)
+
+    def getAllNews(self):
+        """
+        Get list of all news items
+
+        Lora: /news
+        """
+        response = self.get(self.build_url('news'))
+        return self.decode(response)
+
+    def getUserNews(self, username='ME'):
+        """
+        Get list of all news items for a user
+
+        Lora: /user/:user/news
+        """
+        response = self.get(self.build_url('user', username, 'news'))
+        return self.decode(response)
+
+    def getNewsItem(self, item):
+        """
+        Get information for a news item
+
+        Lora: /news/:item
+        """
+        response = self.get(self.build_url('news', item))
+        return self.decode(response)
+
+    def getUserDiskQuotaInfo(self, username='ME'):
+        """
+        Get disk quota info for given user
+
+        Lora: /user/:user/quotas
+        """
+        response = self.get(self.build_url('user', username, 'quotas'))
+        return self.decode(response)
+
+    def getUserCpuUsage(self, username='ME'):
+        """
+        Get cpu usage info for given user
+
+        Lora: /user/:user/cpuutil/daily
+        """
+        response = self.get(self.build_url('user', username, 'cpuutil', 'daily'))
+        return self.decode(response)
+
+    def getUserJobs(self, username='ME'):
+        """
+        Get job info for given user
+
+        Lora: /user/:user/queue
+        """
+        response = self.get(self.build_url('user', username, 'queue'))
+        return self.as_records(self.decode(response), Job, 'jobs')
+
+    def getUserJobsForHost(self, host, username='ME'):
+        """
+        Get job info for given user on given host
+
+        Lora: /user/:user/queue?host=host
+        """
+        payload = {'filter': 'allJobs', 'host': host}
+        response = self.get(self.build_url('user', username, 'queue'),
+                            params=payload)
+        return self.as_records(self.decode(response), Job, 'jobs')
+
+    def getBankHistory(self, bank):
+        """
+        Get history of a bank's usage
+
+        Lora: /bank/:bank/cpuutil/daily
+        """
+        response = self.get(self.build_url('bank', bank, 'cpuutil', 'daily'))
+        return self.decode(response)
+
+    def getBankHistoryForHost(self, bank, host):
+        """
+        Get history of a bank's usage on a host
+
+        Lora: /cluster/:host/bank/:bank/cpuutil/daily
+        """
+        response = self.get(self.build_url('cluster', host, 'bank', bank, 'cpuutil', 'daily'))
+        return self.decode(response)
+
+    def getUserInfo(self, username='ME'):
+        """
+        Get LDAP info for given user
+
+        Lora: /user/:user
+        """
+        response = self.get(self.build_url('user', username))
+        return self.decode(response)
+
+    def getUserMappings(self, username='ME'):
+        """
+        Get LC mappings (alternate usernames) corresponding to given username
+
+        Lora: /user/:user/mappings
+        """
+        response = self.get(self.build_url('user', username, 'mappings'))
+        return self.decode(response)
+
+    def getUserOun(self, username='ME'):
+        """
+        Get OUN corresponding to given username
+
+        Lora: /user/:user/oun
+        """
+        response = self.get(self.build_url('user', username, 'oun'))
+        return self.decode(response)
+
+    def getFilesystemStatus(self, filesystem=''):
+        """
+        Get status of filesystem
+
+        Lora: /status/filesystem/:filesystem
+        """
+        if filesystem == '':
+            response = self.get(self.build_url('status', 'filesystem'))
+        else:
+            response = self.get(self.build_url('status', 'filesystem', filesystem))
+        return self.decode(response)
+
+    def getPrinterInfo(self, printerQueue):
+        """
+        Get information for a given printer
+
+        Lora: /printer/:printerQueue
+        """
+        response = self.get(self.build_url('printer', printerQueue))
+        return self.decode(response)
+
+    def getAllPrinterInfo(self):
+        """
+        Get information for all printers
+
+        Lora: /printers/details
+        """
+        response = self.get(self.build_url('printers', 'details'))
+        return self.decode(response)
+
+    def getTossStats(self):
+        """
+        Get update statistics for CHAOS and TOSS
+
+        Lora: /chaos
+        """
+        response = self.get(self.build_url('chaos'))
+        return self.decode(response)
+
+    def getUserCompletedJobs(self, period, username='ME'):
+        """
+        Get list of a user's completed jobs for a given time period
+
+        Lora: /user/:user/queue?type=completed&period=:period
+        """
+        payload = {'type': 'completed', 'period': period}
+        response = self.get(self.build_url('user', username, 'queue'), params=payload)
+        return self.as_records(self.decode(response), Job, 'jobs')
+
+    def getPathStat(self, host, path):
+        """
+        Get the information provided by 'stat' on a given path
+
+        Lora: /file/:host:path?view=stat
+        """
+        payload = {'view': 'stat'}
+        response = self.get(self.build_url('file', host, path), params=payload)
+        return self.decode(response)
+
+    def execCommand(self, host, command, options=None):
+        """
+        Run a command on a host
+
+        Lora: /command/:host
+        """
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        payload = dict(options or {})
+        payload['command'] = command
+        response = self.post(self.build_url('command', host), headers=headers, data=payload)
+        return self.decode(response)
+
+    # Job-Related Functions
+
+    def submitJob(self, host, options=None):
+        """
+        Submit a job on a host
+
+        Lora: /queue/:host
+        """
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        response = self.post(self.build_url('queue', host), headers=headers, data=options)
+        return self.decode(response)
+
+    def getJobDetails(self, host, jobid):
+        """
+        Get details about given job on given host
+
+        Lora: /queue/:host/:jobid?livedata=1
+        """
+        payload = {'livedata': 1}
+        response = self.get(self.build_url('queue', host, jobid), params=payload)
+        return self.decode(response)
+
+    def getSacctJobDetails(self, host, jobid, startDate, endDate):
+        """
+        Get details about a job using Slurm sacct command
+
+        Lora: /queue/:host/:jobid/jobdetails?startDate=:startDate&endDate=:endDate
+        """
+        payload = {'startDate': startDate, 'endDate': endDate}
+        response = self.get(self.build_url('queue', host, jobid, 'jobdetails'), params=payload)
+        return self.decode(response)
+
+    def getJobScript(self, host, jobid, date):
+        """
+        Get job script for given job; requires special access
+
+        Lora: /queue/:host/:jobid/:date/jobscript
+        """
+        response = self.get(self.build_url('queue', host, jobid, date, 'jobscript'))
+        return self.decode(response)
+
+    def getJobSteps(self, host, jobid):
+        """
+        Get the job steps for a job on a host
+
+        Lora: /queue/:host/:jobid/steps
+        """
+        response = self.get(self.build_url('queue', host, jobid, 'steps'))
+        return self.decode(response)
+
+    def checkJob(self, host, jobid):
+        """
+        Run checkjob on a job on a host
+
+        Lora: /queue/:host/:jobid/check
+        """
+        response = self.get(self.build_url('queue', host, jobid, 'check'))
+        return self.decode(response)
+
+    def editJobParams(self, host, jobid, options=None):
+        """
+        Edit parameters for a job on a host
+
+        Lora: /queue/:host/:jobid
+        """
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        payload = dict(options or {})
+        payload['operator'] = 'modify'
+        response = self.put(self.build_url('queue', host, jobid), headers=headers, data=payload)
+        return self.decode(response)
+
+    def sendJobSignal(self, host, jobid, signal):
+        """
+        Send a signal to a job on a host
+
+        Lora: /queue/:host/:jobid
+        """
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        payload = {'operator': 'signal', 'signal': signal}
+        response = self.put(self.build_url('queue', host, jobid), headers=headers, data=payload)
+        return self.decode(response)
+
+    def holdJob(self, host, jobid):
+        """
+        Hold a job on a host
+
+        Lora: /queue/:host/:jobid
+        """
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        payload = {'operator': 'hold'}
+        response = self.put(self.build_url('queue', host, jobid), headers=headers, data=payload)
+        return self.decode(response)
+
+    def unholdJob(self, host, jobid):
+        """
+        Unhold a job on a host
+
+        Lora: /queue/:host/:jobid
+        """
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        payload = {'operator': 'unhold'}
+        response = self.put(self.build_url('queue', host, jobid), headers=headers, data=payload)
+        return self.decode(response)
+
+    def cancelJob(self, host, jobid):
+        """
+        Cancel a job on a host
+
+        Lora: /queue/:host/:jobid
+        """
+        response = self.delete(self.build_url('queue', host, jobid))
+        return self.decode(response)
+
+    # License Functions
+
+    def getAllLicenses(self):
+        """
+        Get a list of all licenses
+
+        Lora: /status/license
+        """
+        response = self.get(self.build_url('status', 'license'))
+        return self.decode(response)
+
+    def getLicenseInfo(self, licenseName):
+        """
+        Get information on a license
+
+        Lora: /status/license/:license
+        """
+        response = self.get(self.build_url('status', 'license', licenseName))
+        return self.decode(response)
+
+    def getAllLicenseInfo(self):
+        """
+        Get information on all licenses
+
+        Lora: /status/license/all
+        """
+        response = self.get(self.build_url('status', 'license', 'all'))
+        return self.decode(response)
+
+    # GiveTake Functions
+
+    def getMyGiveTake(self):
+        """
+        Get my give take status
+
+        Lora: /user/ME/givetake
+        """
+        response = self.get(self.build_url('user', 'ME', 'givetake'))
+        return self.decode(response)
+
+    def takeMyFiles(self, targetDir, fromUsers, force=0):
+        """
+        Take files given to you
+
+        Lora: /user/ME/take
+
+        Note: 'fromUsers' arg must be a list for multiple
+
+        """
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        payload = {'target': targetDir, 'from[]': fromUsers, 'force': force}
+        response = self.post(self.build_url('user', 'ME', 'take'), headers=headers, data=payload)
+        return self.decode(response)
+
+    def giveMyFiles(self, files, to, force=0):
+        """
+        Give files to another user
+
+        Lora: /user/ME/give
+
+        Note: 'files' arg must be a list for multiple, 'to' arg must be a list for multiple
+        """
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        payload = {'files[]': files, 'to[]': to, 'force': force}
+        response = self.post(self.build_url('user', 'ME', 'give'), headers=headers, data=payload)
+        return self.decode(response)
+
+    # Other Functions
+
+    def getUserSshHosts(self, username='ME'):
+        """
+        Get a list of the given user's ssh hosts
+
+        LORA: /user/:user/sshhosts
+        """
+        response = self.get(self.build_url('user', username, 'sshhosts'))
+        return self.decode(response)
+
+    def getBankMembership(self, bank, host):
+        """
+        Get membership list of a bank on a host
+
+        LORA: /bank/:bank/membership/:host
+        """
+        response = self.get(self.build_url('bank', bank, 'membership', host))
+        return self.decode(response)
+
+    def getScratchFilesystems(self):
+        """
+        Get a list of scratch filesystems
+
+        LORA: /scratchfs
+        """
+        response = self.get(self.build_url('scratchfs'))
+        return self.decode(response)
+
+    def getParallelFilesystems(self):
+        """
+        Get a list of parallel filesystems
+
+        LORA: /parallelfs
+        """
+        response = self.get(self.build_url('parallelfs'))
+        return self.decode(response)
+
+    def getMyPurgedFiles(self, days=''):
+        """
+        Get your purged files for a given number of days
+
+        LORA: /user/ME/purgedFiles?days=:days
+        """
+        if days == '':
+            response = self.get(self.build_url('user', 'ME', 'purgedFiles'))
+        else:
+            payload = {'days': days}
+            response = self.get(self.build_url('user', 'ME', 'purgedFiles'), params=payload)
+        return self.decode(response)
+
+    def getAllUsers(self):
+        """
+        Get a list of all users
+
+        LORA: /users
+        """
+        response = self.get(self.build_url('users'))
+        return self.decode(response)
+
+    def getAllUsersInfo(self, dataType=''):
+        """
+        Get info for all users in dict or list format
+
+        LORA: /users?info=all&type=:dataType
+        """
+        payload = {'info': 'all'}
+        if dataType != '':
+            payload['type'] = 'array'
+        response = self.get(self.build_url('user'), params=payload)
+        return self.as_records(self.decode(response), User)
+
+    def isUserInGroup(self, group, username='ME'):
+        """
+        Check if user is a member of a group
+
+        LORA: /user/:user/group/:group
+        """
+        response = self.get(self.build_url('user', username, 'group', group))
+        return self.decode(response)
+
+    def getUserPocContactees(self, oun):
+        """
+        Get a list of who the user (by oun) is POC for
+
+        LORA: /user/:oun/contactees
+        """
+        response = self.get(self.build_url('user', oun, 'contactees'))
+        return self.decode(response)
+
+    def getFileUrl(self, host, path):
+        """
+        Get the url for a file
+
+        LORA: /lorenz/lora/lora.cgi/file/:host/:path?view=read&format=auto
+        """
+        return self.build_url('file', host, path) + '?view=read&format=auto'
+
+    def getDirListing(self, host, path):
+        """
+        Get the directory listing for path on host
+
+        LORA: /file/:host/:path?view=list
+        """
+        payload = {'view': 'list'}
+        response = self.get(self.build_url('file', host, path), params=payload)
+        return self.decode(response)
+
+    def getRecentImage(self, host, path, nameFormat):
+        """
+        Get a recent image
+
+        LORA: /file/image/:host:path?nameFormat=:nameFormat
+        """
+        payload = {'nameFormat': nameFormat}
+        response = self.get(self.build_url('file', 'image', host, path), params=payload)
+        return self.decode(response)
+
+    def readFile(self, host, path):
+        """
+        Read a file from host
+
+        LORA: /file/:host/:path?view=read&format=auto
+        """
+        payload = {'view': 'read', 'format': 'auto'}
+        response = self.get(self.build_url('file', host, path), params=payload)
+        return response.text
+
+    def getUserTransferHosts(self, username='ME'):
+        """
+        Get a list of transfer hosts for a user
+
+        LORA: /user/:user/transferhosts
+        """
+        response = self.get(self.build_url('user', username, 'transferhosts'))
+        return self.decode(response)
+
+    def getNetworkInfo(self):
+        """
+        Get info from the network you are on
+
+        LORA: /support/network
+        """
+        response = self.get(self.build_url('support', 'network'))
+        return self.decode(response)
+
+    def getMachineStatus(self):
+        """
+        Get statuses of machines
+
+        LORA: /status/machines
+        """
+        response = self.get(self.build_url('status', 'machines'))
+        return self.decode(response)
+
+    def getUserEnclaveStatus(self, username='ME'):
+        """
+        Get the enclave status of a user
+
+        LORA: /user/:user/enclavestatus
+        """
+        response = self.get(self.build_url('user', username, 'enclavestatus'))
+        return self.decode(response)
+
+    def getWeather(self):
+        """
+        Get weather information from local source
+
+        Lora: /weather
+        """
+        response = self.get(self.build_url('weather'))
+        return self.decode(response)
+
+    def getClusterBackfill(self):
+        """
+        Get backfill info for all clustersLDAP info for given user
+
+        Lora: /clusters/backfill
+        """
+        response = self.get(self.build_url('clusters', 'backfill'))
+        return self.decode(response)
+
+    def getLoginNodeStatus(self):
+        """
+        Get status for all login nodes
+
+        Lora: /status/loginNode
+        """
+        response = self.get(self.build_url('status', 'loginNode'))
+        return self.decode(response)
+
+    def getUserProcessesForHost(self, host, username='ME'):
+        """
+        Get processes for given user on given host
+
+        Lora: /user:user/cluster/:host/processes
+        """
+        response = self.get(self.build_url('user', username, 'cluster', host, 'processes'))
+        return self.decode(response)
+
+    def getAllUserProcesses(self, username='ME'):
+        """
+        Get processes for given user on all hosts
+
+        Lora: /user:user/cluster/processes
+        """
+        response = self.get(self.build_url('user', username, 'cluster', 'processes'))
+        return self.decode(response)
+
+    def killProcess(self, hosts, pids):
+        """
+        Kill specified processes on given hosts
+
+        Lora: /cluster/processes [POST]
+
+        Note: 'pids' arg must be a list for multiple
+        """
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        payload = {'clusters[]': hosts, 'processes[]': pids}
+        response = self.post(self.build_url('cluster', 'processes'), headers=headers, data=payload)
+        return self.decode(response)
+
+    def tailFile(self, host, path, nlines):
+        """
+        Get trailing lines from given file
+
+        Lora: /data/:host [POST]
+        """
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        payload = {'host': host, 'path': path, 'tail': nlines, 'type': 'text'}
+        response = self.post(self.build_url('data', host), headers=headers, data=payload)
+        return self.decode(response)
+
+    def getLustreDowntime(self, lustreArgs):
+        """
+        Get details about past Lustre downtimes
+
+        Lora: /lustre/downtime [POST]
+        """
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        payload = lustreArgs
+        response = self.post(self.build_url('lustre', 'downtime'), headers=headers, data=payload)
+        return self.decode(response)
+
+    def getLustreNickname(self, filesystem=''):
+        """
+        Get the nickname of a filesystem or all filesystems
+
+        LORA: /lustre/nickname/?filesys=:filesystem
+        """
+        if(filesystem == ''):
+            response = self.get(self.build_url('lustre', 'nickname') + '/')
+        else:
+            payload = {'filesys': filesystem}
+            response = self.get(self.build_url('lustre', 'nickname') + '/', params=payload)
+        return self.decode(response)
+
+    def getMachineEvents(self, eventType, eventArgs):
+        """
+        Get details about events on machines
+
+        Lora: /events/:type [POST]
+        """
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        payload = eventArgs
+        response = self.post(self.build_url('events', eventType), headers=headers, data=payload)
+        return self.decode(response)
+
+    def getClusterBatchDetails(self, host, username='ME'):
+        """
+        Get batch details for given host and user
+
+        Lora: /user/:user/cluster/:host/batchdetails
+        """
+        response = self.get(self.build_url('user', username, 'cluster', host, 'batchdetails'))
+        return self.decode(response)
+
+    def getAllClusterBatchDetails(self):
+        """
+        Get batch details for all hosts
+
+        Lora: /clusters/batchdetails
+        """
+        response = self.get(self.build_url('clusters', 'batchdetails'))
+        return self.decode(response)
+
+
+class RZLoraSession(LoraSession):
+    domain = 'https://rzlc.llnl.gov'
+    login_prompt = 'Pin & Cryptocard: '
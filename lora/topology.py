@@ -0,0 +1,198 @@
+"""
+Parsed switch topology of a cluster
+
+getHostTopology() lists every switch with the nodes and switches below it.
+A TopologyIndex parses that once into lookup tables, so placement questions
+such as "which leaf switch is node N on", "which nodes share it" and "how
+many links apart are two nodes" are answered without walking the JSON:
+
+    >>> topo = TopologyIndex.fetch(session, 'quartz')
+    >>> topo.switch_of('quartz17')
+    'leaf3'
+    >>> topo.distance('quartz17', 'quartz2000')
+    4
+
+Indexes can be saved and loaded, and ClusterCatalog.getTopology() keeps one
+per cluster built from the catalog's cached topology.
+"""
+
+import json
+import logging
+
+from lora.util import expand_hostlist
+
+logger = logging.getLogger(__file__)
+
+# Field names tried, in order, for each switch in the getHostTopology() output
+SWITCH_NAME_FIELDS = ('name', 'switch', 'SwitchName')
+SWITCH_NODES_FIELDS = ('nodes', 'Nodes')
+SWITCH_CHILDREN_FIELDS = ('switches', 'Switches')
+
+
+def _field(entry, names, default=None):
+    for name in names:
+        if name in entry:
+            return entry[name]
+    return default
+
+
+def parse_switches(output):
+    """
+    Normalize a getHostTopology() output to {switch: {'nodes': [...], 'switches': [...]}}
+
+    The output may be a list of switches or a dict of them keyed by name;
+    nodes and child switches may be lists or Slurm hostlists.
+    """
+    if isinstance(output, dict):
+        entries = [dict(entry, name=name) for name, entry in output.items()]
+    else:
+        entries = output
+
+    switches = {}
+    for entry in entries:
+        name = _field(entry, SWITCH_NAME_FIELDS)
+        switches[name] = {
+            'nodes': expand_hostlist(_field(entry, SWITCH_NODES_FIELDS) or []),
+            'switches': expand_hostlist(_field(entry, SWITCH_CHILDREN_FIELDS) or []),
+        }
+    return switches
+
+
+class TopologyIndex(object):
+    """
+    Lookup tables over the switch tree of one cluster
+
+    Node and switch lookups are dict lookups. Distances are counted in links
+    (node to leaf switch, switch to switch) through the lowest common switch
+    and are memoized per pair of leaf switches.
+    """
+
+    def __init__(self, host, switches):
+        self.host = host
+        self.switches = switches
+
+        self.node_switch = {}
+        self.parent = {}
+        for name, switch in switches.items():
+            for node in switch['nodes']:
+                self.node_switch[node] = name
+            for child in switch['switches']:
+                self.parent[child] = name
+
+        # Each switch's path to the root of its tree, the switch itself first
+        self.paths = {}
+        for name in switches:
+            path = [name]
+            while path[-1] in self.parent and len(path) <= len(switches):
+                path.append(self.parent[path[-1]])
+            self.paths[name] = tuple(path)
+
+        self._distances = {}
+
+    @classmethod
+    def from_output(cls, host, output):
+        return cls(host, parse_switches(output))
+
+    @classmethod
+    def fetch(cls, lora_session, host):
+        """
+        Build the index from getHostTopology()
+        """
+        return cls.from_output(host, lora_session.getHostTopology(host)['output'])
+
+    def save(self, path):
+        """
+        Write the index to a JSON file
+        """
+        with open(path, 'w') as f:
+            json.dump({'host': self.host, 'switches': self.switches}, f, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read an index previously written by save()
+        """
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data['host'], data['switches'])
+
+    def __getstate__(self):
+        # The lookup tables are cheaper to rebuild than to pickle
+        return {'host': self.host, 'switches': self.switches}
+
+    def __setstate__(self, state):
+        self.__init__(state['host'], state['switches'])
+
+    @property
+    def nodes(self):
+        return sorted(self.node_switch)
+
+    def __contains__(self, node):
+        return node in self.node_switch
+
+    def switch_of(self, node):
+        """
+        Get the leaf switch a node is on, or None for an unknown node
+        """
+        return self.node_switch.get(node)
+
+    def path_of(self, node):
+        """
+        Get the switches from a node's leaf switch up to the root
+        """
+        switch = self.node_switch.get(node)
+        return self.paths[switch] if switch is not None else ()
+
+    def nodes_on(self, switch):
+        """
+        Get the nodes directly on a switch
+        """
+        return self.switches[switch]['nodes']
+
+    def peers(self, node):
+        """
+        Get the other nodes sharing a node's leaf switch
+        """
+        switch = self.node_switch.get(node)
+        if switch is None:
+            return []
+        return [n for n in self.switches[switch]['nodes'] if n != node]
+
+    def adjacent(self, switch):
+        """
+        Get the switches linked to a switch: its parent, if any, then its children
+        """
+        parent = self.parent.get(switch)
+        return ([parent] if parent is not None else []) + list(self.switches[switch]['switches'])
+
+    def group_by_switch(self, nodes):
+        """
+        Group nodes by leaf switch, e.g. to check how many switches an allocation spans
+        """
+        groups = {}
+        for node in nodes:
+            groups.setdefault(self.node_switch.get(node), []).append(node)
+        return groups
+
+    def switch_distance(self, a, b):
+        """
+        Links between two switches through their lowest common switch, or None if not connected
+        """
+        key = (a, b) if a <= b else (b, a)
+        if key not in self._distances:
+            levels = dict((s, i) for i, s in enumerate(self.paths[a]))
+            self._distances[key] = next(
+                (levels[s] + j for j, s in enumerate(self.paths[b]) if s in levels), None)
+        return self._distances[key]
+
+    def distance(self, a, b):
+        """
+        Links between two nodes: 0 for the same node, 2 on the same leaf switch, None if either is unknown
+        """
+        if a == b:
+            return 0
+        switch_a, switch_b = self.node_switch.get(a), self.node_switch.get(b)
+        if switch_a is None or switch_b is None:
+            return None
+        between = self.switch_distance(switch_a, switch_b)
+        return None if between is None else between + 2
@@ -0,0 +1,110 @@
+"""
+Per-request tracing exportable as Chrome trace events
+
+Set a Tracer on a session to record every request, split into the wait for
+the first byte, the download of the body and the JSON decode, and wrap
+higher level operations in spans:
+
+    >>> session.tracer = Tracer()
+    >>> with session.tracer.span('dashboard refresh'):
+    ...     index.refresh()
+    >>> session.tracer.export('refresh.json')
+
+Load the file in chrome://tracing or https://ui.perfetto.dev to see each
+thread's requests on a timeline. requests does not expose connection setup
+separately, so connect time is part of time-to-first-byte.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+clock = getattr(time, 'perf_counter', time.time)
+
+
+class Tracer(object):
+    """
+    Collects complete ('X') trace events from any thread
+    """
+
+    def __init__(self, max_events=100000):
+        self.max_events = max_events
+        self.events = []
+        self.dropped = 0
+
+        self._start = clock()
+        self._lock = threading.Lock()
+        self._threads = {}
+
+    def now(self):
+        return clock()
+
+    def record(self, name, start, end, cat='request', args=None):
+        """
+        Record an event that ran from start to end, both taken from now()
+        """
+        thread = threading.current_thread()
+        event = {
+            'name': name,
+            'cat': cat,
+            'ph': 'X',
+            'ts': (start - self._start) * 1e6,
+            'dur': (end - start) * 1e6,
+            'pid': os.getpid(),
+            'tid': thread.ident,
+        }
+        if args:
+            event['args'] = args
+        with self._lock:
+            self._threads[thread.ident] = thread.name
+            if len(self.events) >= self.max_events:
+                self.dropped += 1
+                return
+            self.events.append(event)
+
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        """
+        Record the enclosed block as a span around the requests it makes
+        """
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.record(name, start, self.now(), cat='span', args=args)
+
+    def to_chrome_trace(self):
+        """
+        Get the events in Chrome trace event format
+        """
+        with self._lock:
+            events = list(self.events)
+            threads = dict(self._threads)
+        pid = os.getpid()
+        for tid, name in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, path):
+        """
+        Write the events to a Chrome trace JSON file
+        """
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+def span(lora_session, name, **args):
+    """
+    A span on the session's tracer, or a no-op if the session is not traced
+    """
+    tracer = getattr(lora_session, 'tracer', None)
+    if tracer is None:
+        return _null_span()
+    return tracer.span(name, **args)
+
+
+@contextlib.contextmanager
+def _null_span():
+    yield
@@ -0,0 +1,219 @@
+"""
+Lighter HTTP transports for LoraSession
+
+By default every request goes through requests.Session, whose per-request
+work (hooks, settings and cookie merging, adapters) adds up over thousands
+of small calls. A transport sends API requests more directly, reusing the
+session's headers and cookies:
+
+    >>> session = lora.LoraSession(transport='urllib3')
+
+login() always uses requests, since it relies on requests' authentication
+and cookie handling.
+"""
+
+import json
+
+import requests
+from requests.cookies import MockRequest, MockResponse, get_cookie_header
+
+try:
+    from urllib.parse import urlencode, urlsplit
+except ImportError:  # Python 2
+    from urllib import urlencode
+    from urlparse import urlsplit
+
+
+class TransportResponse(object):
+    """
+    The parts of requests.Response used by LoraSession methods
+    """
+
+    def __init__(self, status_code, headers, content, url=None, set_cookies=()):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.set_cookies = list(set_cookies)
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', 'replace')
+
+    def json(self):
+        return json.loads(self.content.decode('utf-8'))
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError('%s Error for url: %s' % (self.status_code, self.url), response=self)
+
+
+class _SetCookieHeaders(object):
+    """
+    The Set-Cookie headers of a response, as http.cookiejar reads them
+    """
+
+    def __init__(self, values):
+        self.values = values
+
+    def get_all(self, name, default=None):
+        if name.lower() == 'set-cookie' and self.values:
+            return list(self.values)
+        return default
+
+    def getheaders(self, name):  # Python 2
+        return self.get_all(name, [])
+
+
+class Transport(object):
+    """
+    Base class for transports
+
+    Cookies are sent and stored through the session's cookie jar, with the
+    same domain, path, secure and expiry rules as requests. The session's
+    verify and cert settings (and REQUESTS_CA_BUNDLE) are honored; proxies
+    are not supported, so a request that would use one raises ValueError.
+
+    Subclasses implement send() for an already encoded request, using
+    verify and cert from the settings given.
+    """
+
+    def __init__(self):
+        self._settings = {}
+
+    def settings(self, session, url):
+        """
+        The verify and cert settings for a url, as requests would use them
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc, str(session.verify), str(session.cert),
+               tuple(sorted(session.proxies.items())), session.trust_env)
+        if key not in self._settings:
+            merged = session.merge_environment_settings(url, {}, None, None, None)
+            proxies = dict((k, v) for k, v in merged['proxies'].items() if v and k != 'no_proxy')
+            if proxies:
+                raise ValueError('Proxies are not supported by %s (%s); use transport=None'
+                                 % (type(self).__name__, ', '.join(sorted(proxies))))
+            self._settings[key] = (merged['verify'], merged['cert'])
+        return self._settings[key]
+
+    def request(self, session, method, url, params=None, data=None, headers=None, timeout=None, **kwargs):
+        if params:
+            url = '%s%s%s' % (url, '&' if '?' in url else '?', urlencode(params, doseq=True))
+        if isinstance(data, dict):
+            data = urlencode(data, doseq=True)
+        if data is not None and not isinstance(data, bytes):
+            data = data.encode('utf-8')
+
+        merged = dict(session.headers)
+        merged.update(headers or {})
+        cookie_request = requests.Request(method, url, headers=merged)
+        cookie = get_cookie_header(session.cookies, cookie_request)
+        if cookie:
+            merged['Cookie'] = cookie
+
+        verify, cert = self.settings(session, url)
+        response = self.send(method, url, data, merged, timeout, verify, cert)
+        if response.set_cookies:
+            session.cookies.extract_cookies(MockResponse(_SetCookieHeaders(response.set_cookies)),
+                                            MockRequest(cookie_request))
+        return response
+
+    def send(self, method, url, body, headers, timeout, verify=True, cert=None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class Urllib3Transport(Transport):
+    """
+    Sends requests straight through urllib3 connection pools, one per TLS setting
+    """
+
+    def __init__(self, maxsize=10):
+        super(Urllib3Transport, self).__init__()
+        import urllib3
+        self.urllib3 = urllib3
+        self.maxsize = maxsize
+        self.pools = {}
+
+    def _pool(self, verify, cert):
+        key = (str(verify), str(cert))
+        if key not in self.pools:
+            from requests.utils import DEFAULT_CA_BUNDLE_PATH
+            kwargs = {'cert_reqs': 'CERT_REQUIRED' if verify else 'CERT_NONE'}
+            if verify:
+                kwargs['ca_certs'] = verify if isinstance(verify, str) else DEFAULT_CA_BUNDLE_PATH
+            if cert:
+                kwargs['cert_file'], kwargs['key_file'] = cert if isinstance(cert, tuple) else (cert, None)
+            self.pools[key] = self.urllib3.PoolManager(maxsize=self.maxsize, block=False, **kwargs)
+        return self.pools[key]
+
+    def send(self, method, url, body, headers, timeout, verify=True, cert=None):
+        if isinstance(timeout, tuple):
+            timeout = self.urllib3.Timeout(connect=timeout[0], read=timeout[1])
+        response = self._pool(verify, cert).request(method, url, body=body, headers=headers,
+                                                    timeout=timeout, retries=False, redirect=False)
+        return TransportResponse(response.status, response.headers, response.data, url,
+                                 response.headers.getlist('Set-Cookie'))
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.clear()
+
+
+class HttpxTransport(Transport):
+    """
+    Sends requests through httpx, multiplexing them over HTTP/2 when the h2 package is installed
+    """
+
+    def __init__(self, http2=True):
+        super(HttpxTransport, self).__init__()
+        import httpx
+        self.httpx = httpx
+        self.http2 = http2
+        self.clients = {}
+
+    def _client(self, verify, cert):
+        key = (str(verify), str(cert))
+        if key not in self.clients:
+            try:
+                self.clients[key] = self.httpx.Client(http2=self.http2, verify=verify, cert=cert)
+            except ImportError:
+                self.clients[key] = self.httpx.Client(verify=verify, cert=cert)
+        return self.clients[key]
+
+    def send(self, method, url, body, headers, timeout, verify=True, cert=None):
+        if isinstance(timeout, tuple):
+            timeout = self.httpx.Timeout(timeout[1], connect=timeout[0])
+        response = self._client(verify, cert).request(method, url, content=body, headers=headers, timeout=timeout)
+        return TransportResponse(response.status_code, response.headers, response.content, url,
+                                 response.headers.get_list('set-cookie'))
+
+    def close(self):
+        for client in self.clients.values():
+            client.close()
+
+
+TRANSPORTS = {
+    'urllib3': Urllib3Transport,
+    'httpx': HttpxTransport,
+}
+
+
+def get_transport(transport):
+    """
+    Get a transport by name; None selects requests itself and instances are returned as is
+    """
+    if transport is None or isinstance(transport, Transport):
+        return transport
+    if transport == 'requests':
+        return None
+    if transport not in TRANSPORTS:
+        raise ValueError('Unknown transport: %s' % transport)
+    return TRANSPORTS[transport]()
@@ -2,6 +2,7 @@
 A collection of utilities and examples for working with the Lora REST API
 """
 
+import os
 from collections import Counter
 
 
@@ -12,3 +13,107 @@ def get_num_jobs_per_host(lora_session):
     jobs = lora_session.getAllJobDetails()['output']['jobs']
     hosts = [j['Host'] for j in jobs]
     return Counter(hosts)
+
+
+def parse_duration(value):
+    """
+    Convert a [[dd-]hh:]mm:ss duration, as used by ps and Slurm, to seconds
+
+    Numbers are assumed to already be seconds.
+    """
+    if isinstance(value, (int, float)):
+        return value
+    days = 0
+    if '-' in value:
+        d, value = value.split('-', 1)
+        days = int(d)
+    seconds = 0
+    for part in value.split(':'):
+        seconds = seconds * 60 + float(part)
+    return days * 86400 + seconds
+
+
+# Slurm limit values meaning there is no limit
+UNLIMITED = frozenset(['UNLIMITED', 'INFINITE'])
+
+
+def parse_limit(value, convert=int):
+    """
+    Convert a job limit such as max_submit or max_time, returning None when there is none
+    """
+    if value is None or str(value).upper() in UNLIMITED:
+        return None
+    return convert(value)
+
+
+def normalize_timestamp(value):
+    """
+    Convert a timestamp to the 'YYYY-MM-DD HH:MM:SS' form, which sorts as a string
+
+    Lora uses both 'YYYY-MM-DDTHH:MM:SS' and 'YYYY-MM-DD HH:MM:SS'; datetimes
+    and dates are accepted too. Dates alone are taken as midnight.
+    """
+    if value is None:
+        return None
+    value = str(value).replace('T', ' ')
+    if len(value) == 10:
+        value += ' 00:00:00'
+    return value
+
+
+def expand_hostlist(value):
+    """
+    Expand a Slurm hostlist such as 'cab[1-3,7],quartz12' into node names
+
+    Zero padded ranges keep their padding; lists of names are returned as is.
+    """
+    if not isinstance(value, str):
+        return list(value)
+
+    names = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(value + ','):
+        if char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            if value[start:i]:
+                names.extend(_expand_host(value[start:i]))
+            start = i + 1
+    return names
+
+
+def _expand_host(pattern):
+    if '[' not in pattern:
+        return [pattern]
+    prefix, rest = pattern.split('[', 1)
+    ranges, suffix = rest.split(']', 1)
+    names = []
+    for part in ranges.split(','):
+        if '-' in part:
+            lo, hi = part.split('-', 1)
+        else:
+            lo = hi = part
+        width = len(lo)
+        for n in range(int(lo), int(hi) + 1):
+            names.extend(prefix + str(n).zfill(width) + s for s in _expand_host(suffix))
+    return names
+
+
+def open_private(path):
+    """
+    Open a file for writing secrets, making it readable only by the user
+
+    The mode of an existing file is tightened before it is truncated and
+    written to, since os.open() only applies a mode when creating the file.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o600)
+    try:
+        os.fchmod(fd, 0o600)
+        os.ftruncate(fd, 0)
+    except Exception:
+        os.close(fd)
+        raise
+    return os.fdopen(fd, 'w')
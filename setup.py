@@ -13,8 +13,14 @@ setup(
     author_email='lee1001@llnl.gov',
     url='https://github.com/llnl/python-lora',
     packages=find_packages(),
+    entry_points={
+        'console_scripts': [
+            'lora = lora.cli:main',
+        ],
+    },
     install_requires=[
         'requests',
+        'futures; python_version < "3"',
     ],
     classifiers=[
         'Development Status :: 3 - Alpha',
@@ -0,0 +1,46 @@
+"""
+Tests for lora.advisor
+"""
+
+import unittest
+
+from lora.advisor import ClusterAdvisor
+from lora.catalog import ClusterCatalog, ClusterRecord
+from lora.models import Cluster
+
+
+class FakeSession(object):
+    tracer = None
+
+    def getClusterBackfill(self):
+        return {'output': {}}
+
+    def getAllMachineLoads(self):
+        clusters = [Cluster.from_dict({'host': 'cab', 'load': 90}), Cluster.from_dict({'host': 'quartz', 'load': 10})]
+        return {'output': {'clusters': clusters}}
+
+    def getAllClusterUtilizations(self):
+        return {'output': {}}
+
+    def getUserBanksByHost(self):
+        return {'output': {'cab': ['lc'], 'quartz': ['lc']}}
+
+
+class ClusterAdvisorTest(unittest.TestCase):
+
+    def setUp(self):
+        catalog = ClusterCatalog([
+            ClusterRecord('cab', {}, [], {'max_time': 'UNLIMITED', 'max_nodes': 'INFINITE'}),
+            ClusterRecord('quartz', {}, [], {'max_time': '1:00:00'}),
+        ])
+        self.advisor = ClusterAdvisor(FakeSession(), catalog)
+
+    def test_lower_load_ranks_first(self):
+        self.assertEqual([a.host for a in self.advisor.rank(4, '0:30:00')], ['quartz', 'cab'])
+
+    def test_unlimited_limits_do_not_exclude(self):
+        self.assertEqual([a.host for a in self.advisor.rank(4000, '2:00:00')], ['cab'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Tests for lora.archive
+"""
+
+import unittest
+
+from lora.archive import JobArchive
+
+
+class FakeSession(object):
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def getSacctJobDetails(self, host, jobid, startDate, endDate):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+class SacctCacheTest(unittest.TestCase):
+
+    def lookup(self, archive, session):
+        return archive.getSacctJobDetails(session, 'cab', 1, '2016-08-01', '2016-09-01')
+
+    def test_successful_details_are_stored(self):
+        archive = JobArchive(':memory:')
+        session = FakeSession([{'status': 'OK', 'error': '', 'output': [{'JobID': 1}]}])
+        self.lookup(archive, session)
+        self.assertEqual(self.lookup(archive, session)['output'], [{'JobID': 1}])
+        self.assertEqual(session.calls, 1)
+
+    def test_failures_are_not_stored(self):
+        archive = JobArchive(':memory:')
+        session = FakeSession([
+            {'status': 'ERROR', 'error': 'timed out', 'output': None},
+            {'status': 'OK', 'error': '', 'output': []},
+            {'status': 'OK', 'error': '', 'output': [{'JobID': 1}]},
+        ])
+        self.lookup(archive, session)
+        self.lookup(archive, session)
+        self.assertEqual(self.lookup(archive, session)['output'], [{'JobID': 1}])
+        self.assertEqual(session.calls, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Tests for lora.crawl
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from lora.crawl import Crawl
+
+
+class CrawlTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'crawl.jsonl')
+        self.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def fetch(self, key):
+        self.calls.append(key)
+        return key.upper()
+
+    def test_resume_skips_completed_keys(self):
+        Crawl(None, self.fetch, ['a', 'b'], self.path).run()
+        stats = Crawl(None, self.fetch, ['a', 'b', 'c'], self.path).run()
+
+        self.assertEqual(stats, (1, 2, 0))
+        self.assertEqual(sorted(self.calls), ['a', 'b', 'c'])
+
+    def test_resume_after_a_line_cut_short(self):
+        Crawl(None, self.fetch, ['a'], self.path).run()
+        with open(self.path, 'a') as f:
+            f.write('{"key": "b", "res')
+
+        stats = Crawl(None, self.fetch, ['a', 'b', 'c'], self.path).run()
+
+        self.assertEqual(stats, (2, 1, 0))
+        self.assertEqual(dict(Crawl(None, self.fetch, [], self.path).results()),
+                         {'a': 'A', 'b': 'B', 'c': 'C'})
+
+    def test_failed_keys_are_retried(self):
+        def fetch(key):
+            if key == 'b' and not self.calls:
+                self.calls.append(key)
+                raise RuntimeError('down')
+            return key
+
+        self.assertEqual(Crawl(None, fetch, ['b'], self.path).run(), (0, 0, 1))
+        self.assertEqual(Crawl(None, fetch, ['b'], self.path).run(), (1, 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
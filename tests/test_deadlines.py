@@ -0,0 +1,106 @@
+"""
+Tests for lora.deadlines
+"""
+
+import threading
+import time
+import unittest
+
+import requests
+
+from lora import deadlines
+from lora.deadlines import DeadlineExceeded, bound, deadline, propagate, remaining
+from lora.parallel import fan_out, fan_out_iter
+
+
+class DeadlineTest(unittest.TestCase):
+
+    def test_no_deadline_leaves_timeouts_alone(self):
+        self.assertIsNone(remaining())
+        self.assertEqual(bound((10, 120)), (10, 120))
+        self.assertIsNone(bound(None))
+
+    def test_inner_deadline_can_only_shorten(self):
+        with deadline(10):
+            with deadline(100):
+                self.assertLessEqual(remaining(), 10)
+            with deadline(1):
+                self.assertLessEqual(remaining(), 1)
+            with deadline(None):
+                self.assertGreater(remaining(), 1)
+            self.assertGreater(remaining(), 1)
+        self.assertIsNone(remaining())
+
+    def test_tuple_timeouts_are_shrunk_element_wise(self):
+        with deadline(30):
+            connect, read = bound((10, 120))
+            self.assertEqual(connect, 10)
+            self.assertLessEqual(read, 30)
+            self.assertGreater(read, 10)
+
+            connect, read = bound((None, 5))
+            self.assertLessEqual(connect, 30)
+            self.assertEqual(read, 5)
+
+    def test_scalar_and_missing_timeouts(self):
+        with deadline(30):
+            self.assertEqual(bound(5), 5)
+            self.assertLessEqual(bound(60), 30)
+            self.assertLessEqual(bound(None), 30)
+
+    def test_passed_deadline_raises_a_requests_timeout(self):
+        with deadline(0.01):
+            time.sleep(0.02)
+            self.assertRaises(DeadlineExceeded, bound, (10, 120))
+        self.assertTrue(issubclass(DeadlineExceeded, requests.Timeout))
+
+    def test_deadline_is_per_thread(self):
+        seen = []
+        with deadline(10):
+            thread = threading.Thread(target=lambda: seen.append(remaining()))
+            thread.start()
+            thread.join()
+        self.assertEqual(seen, [None])
+
+    def test_propagate_carries_the_deadline_into_other_threads(self):
+        seen = []
+        with deadline(10):
+            func = propagate(lambda: seen.append(remaining()))
+        thread = threading.Thread(target=func)
+        thread.start()
+        thread.join()
+
+        self.assertLessEqual(seen[0], 10)
+        self.assertIsNone(remaining())
+
+    def test_propagate_without_a_deadline_returns_func(self):
+        self.assertIs(propagate(remaining), remaining)
+
+    def test_fan_out_runs_calls_under_the_caller_deadline(self):
+        with deadline(10):
+            results = fan_out(lambda key: remaining(), range(4), max_workers=2)
+        self.assertTrue(all(r is not None and r <= 10 for r in results.values()))
+
+    def test_fan_out_deadline_shortens_the_caller_deadline(self):
+        with deadline(10):
+            results = fan_out(lambda key: remaining(), range(4), max_workers=2, deadline=1)
+        self.assertTrue(all(r <= 1 for r in results.values()))
+
+    def test_fan_out_iter_deadline_bounds_the_whole_batch(self):
+        def call(key):
+            time.sleep(0.05)
+            return bound(10)
+
+        errors = [f.exception() for _, f in fan_out_iter(call, range(6), max_workers=1, deadline=0.12)]
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[-1], DeadlineExceeded)
+
+    def test_propagated_call_restores_the_thread_deadline(self):
+        with deadline(10):
+            func = propagate(remaining)
+        self.assertLessEqual(func(), 10)
+        self.assertIsNone(deadlines.current())
+
+
+if __name__ == '__main__':
+    unittest.main()
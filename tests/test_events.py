@@ -0,0 +1,126 @@
+"""
+Tests for lora.events
+"""
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from lora.events import EventStore, IntervalIndex
+
+
+def event(host, start, end=None, **fields):
+    return dict(fields, host=host, start=start, end=end)
+
+
+class FakeCalendar(object):
+    """
+    Serves events overlapping the requested range and records the ranges fetched
+    """
+
+    def __init__(self, events):
+        self.events = events
+        self.fetched = []
+
+    def __call__(self, start, end):
+        self.fetched.append((start, end))
+        return [e for e in self.events if e['start'] <= end and (e['end'] is None or e['end'] >= start)]
+
+
+class IntervalIndexTest(unittest.TestCase):
+
+    def test_overlapping(self):
+        index = IntervalIndex()
+        index.add(0, 10, 'a')
+        index.add(20, 30, 'b')
+        index.add(25, float('inf'), 'open')
+
+        self.assertEqual(index.overlapping(5, 5), ['a'])
+        self.assertEqual(sorted(index.overlapping(10, 26)), ['a', 'b', 'open'])
+        self.assertEqual(index.overlapping(40, 50), ['open'])
+        self.assertEqual(index.overlapping(11, 19), [])
+
+    def test_long_intervals_do_not_widen_the_scan(self):
+        index = IntervalIndex(long_after=100)
+        index.add(0, 1000, 'long')
+        index.add(500, 510, 'short')
+
+        self.assertEqual(index.longest, 10)
+        self.assertEqual(sorted(index.overlapping(505, 505)), ['long', 'short'])
+        self.assertEqual(index.overlapping(2000, 2000), [])
+
+    def test_longest_shrinks_when_the_longest_is_removed(self):
+        index = IntervalIndex()
+        index.add(0, 50, 'a')
+        index.add(60, 65, 'b')
+        index.remove(0, 50, 'a')
+
+        self.assertEqual(index.longest, 5)
+        self.assertEqual(list(index), [(60, 65, 'b')])
+
+
+class EventStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_only_gaps_are_fetched(self):
+        calendar = FakeCalendar([event('cab', '2016-01-05 00:00:00', '2016-01-06 00:00:00')])
+        store = EventStore(calendar, 'host')
+        store.update('2016-01-01', '2016-01-10')
+        store.update('2016-01-05', '2016-01-20')
+
+        self.assertEqual(calendar.fetched, [('2016-01-01 00:00:00', '2016-01-10 00:00:00'),
+                                            ('2016-01-10 00:00:00', '2016-01-20 00:00:00')])
+        self.assertEqual(len(store.at('cab', '2016-01-05 12:00:00')), 1)
+        self.assertEqual(store.at('cab', '2016-01-07 12:00:00'), [])
+
+    def test_newer_copy_replaces_the_stored_event(self):
+        store = EventStore(None, 'host')
+        store.add([event('cab', '2016-01-05 00:00:00')])
+        store.add([event('cab', '2016-01-05T00:00:00', '2016-01-06 00:00:00')])
+
+        self.assertEqual(store.at('cab', '2016-02-01'), [])
+        self.assertEqual(len(store.at('cab', '2016-01-05 06:00:00')), 1)
+
+    def test_open_events_are_fetched_again_until_they_end(self):
+        start = (datetime.datetime.now() - datetime.timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S')
+        end = (datetime.datetime.now() + datetime.timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S')
+        calendar = FakeCalendar([event('cab', start)])
+        store = EventStore(calendar, 'host')
+        store.update('2016-01-01', end)
+
+        calendar.events = [event('cab', start, end)]
+        store.update('2016-01-01', end)
+        self.assertEqual(calendar.fetched[1], (start, end))
+
+        store.update('2016-01-01', end)
+        self.assertEqual(len(calendar.fetched), 2)
+
+    def test_stale_open_events_are_not_fetched_again(self):
+        calendar = FakeCalendar([event('cab', '2016-01-05 00:00:00')])
+        store = EventStore(calendar, 'host')
+        store.update('2016-01-01', '2016-02-01')
+        store.update('2016-01-01', '2016-02-01')
+
+        self.assertEqual(len(calendar.fetched), 1)
+        self.assertEqual(len(store.at('cab', '2016-01-20')), 1)
+
+    def test_saved_store_is_reloaded(self):
+        path = os.path.join(self.tmpdir, 'events.json')
+        calendar = FakeCalendar([event('cab', '2016-01-05 00:00:00', '2016-01-06 00:00:00')])
+        EventStore(calendar, 'host', path=path).update('2016-01-01', '2016-01-10')
+        store = EventStore(calendar, 'host', path=path)
+        store.update('2016-01-01', '2016-01-10')
+
+        self.assertEqual(len(calendar.fetched), 1)
+        self.assertEqual(store.keys, ['cab'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Tests for lora.federated against fake per-zone sessions
+"""
+
+import unittest
+
+from lora.federated import ZONE_FIELD, FederatedSession
+from lora.models import Job
+
+
+class FakeZone(object):
+
+    def __init__(self, output=None, error=None):
+        self.output = output
+        self.error = error
+
+    def getAllMachineLoads(self):
+        if self.error is not None:
+            raise self.error
+        return {'error': '', 'output': self.output, 'status': 'OK'}
+
+
+class FederatedSessionTest(unittest.TestCase):
+
+    def test_zone_down_keeps_the_other_answers(self):
+        down = IOError('rz is down')
+        zones = FederatedSession({'cz': FakeZone({'loads': []}), 'rz': FakeZone(error=down)})
+        responses, errors = zones.getAllMachineLoads()
+
+        self.assertEqual(list(responses), ['cz'])
+        self.assertEqual(errors, {'rz': down})
+
+    def test_merged_tags_copies_of_records(self):
+        cz = [{'host': 'cab'}, 'note']
+        rz = [{'host': 'rzgenie'}]
+        zones = FederatedSession({'cz': FakeZone({'loads': cz}), 'rz': FakeZone({'loads': rz})})
+        combined, errors = zones.merged('getAllMachineLoads', 'loads')
+
+        self.assertEqual(errors, {})
+        self.assertEqual(combined, [{'host': 'cab', ZONE_FIELD: 'cz'}, 'note', {'host': 'rzgenie', ZONE_FIELD: 'rz'}])
+        self.assertEqual(cz, [{'host': 'cab'}, 'note'])
+        self.assertEqual(rz, [{'host': 'rzgenie'}])
+
+    def test_merged_dicts_are_keyed_by_zone(self):
+        zones = FederatedSession({'rz': FakeZone({'loads': {'rzgenie': {'host': 'rzgenie'}}})})
+        combined, _ = zones.merged('getAllMachineLoads', 'loads')
+
+        self.assertEqual(combined, {('rz', 'rzgenie'): {'host': 'rzgenie', ZONE_FIELD: 'rz'}})
+
+    def test_merged_records_are_copied(self):
+        job = Job.from_dict({'JobID': 1})
+        zones = FederatedSession({'cz': FakeZone({'loads': [job]})})
+        combined, _ = zones.merged('getAllMachineLoads', 'loads')
+
+        self.assertEqual(combined[0][ZONE_FIELD], 'cz')
+        self.assertNotIn(ZONE_FIELD, job)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+Tests for lora.hedging
+"""
+
+import threading
+import time
+import unittest
+
+from lora.hedging import Hedger
+
+
+class FakeResponse(object):
+
+    def __init__(self, copy):
+        self.copy = copy
+        self.closed = False
+        self.content = b''
+
+    def close(self):
+        self.closed = True
+
+
+class FakeServer(object):
+    """
+    Answers sends after the delay given for each copy of a request, in order
+    """
+
+    def __init__(self, delays=()):
+        self.delays = list(delays)
+        self.sent = 0
+        self.responses = []
+        self.lock = threading.Lock()
+
+    def send(self, method, url, **kwargs):
+        with self.lock:
+            copy = self.sent
+            self.sent += 1
+            delay = self.delays[copy] if copy < len(self.delays) else 0
+        time.sleep(delay)
+        response = FakeResponse(copy)
+        with self.lock:
+            self.responses.append(response)
+        return response
+
+
+def warm(hedger, endpoint, latency, count):
+    for _ in range(count):
+        hedger.observe(endpoint, latency)
+
+
+class HedgerTest(unittest.TestCase):
+
+    def test_threshold_is_per_endpoint(self):
+        hedger = Hedger(percentile=50, min_samples=10, min_delay=0)
+        warm(hedger, '/lora/cluster', 0.01, 10)
+        warm(hedger, '/lora/queue', 2.0, 10)
+
+        self.assertEqual(hedger.threshold('/lora/cluster'), 0.01)
+        self.assertEqual(hedger.threshold('/lora/queue'), 2.0)
+        self.assertIsNone(hedger.threshold('/lora/user'))
+
+    def test_endpoint_ignores_the_query(self):
+        self.assertEqual(Hedger.endpoint('https://lora/cluster/cab?x=1'), '/cluster/cab')
+
+    def test_threshold_uses_the_percentile_and_min_delay(self):
+        hedger = Hedger(percentile=90, min_samples=10, min_delay=0.05)
+        for i in range(10):
+            hedger.observe('/a', i / 100.0)
+
+        self.assertEqual(hedger.threshold('/a'), 0.09)
+        hedger = Hedger(percentile=90, min_samples=10, min_delay=0.5)
+        warm(hedger, '/a', 0.01, 10)
+        self.assertEqual(hedger.threshold('/a'), 0.5)
+
+    def test_old_endpoints_are_dropped(self):
+        hedger = Hedger(max_endpoints=2)
+        for endpoint in ('/a', '/b', '/a', '/c'):
+            hedger.observe(endpoint, 0.01)
+
+        self.assertEqual(list(hedger.latencies), ['/a', '/c'])
+
+    def test_slow_request_is_hedged_and_the_loser_closed(self):
+        hedger = Hedger(percentile=50, min_samples=10, min_delay=0, budget=1)
+        warm(hedger, '/a', 0.01, 10)
+        server = FakeServer(delays=[0.3, 0])
+
+        response = hedger.request(server.send, 'GET', 'http://host/a')
+        self.assertEqual(response.copy, 1)
+        self.assertEqual((hedger.hedged, hedger.won), (1, 1))
+
+        time.sleep(0.4)
+        loser = [r for r in server.responses if r.copy == 0]
+        self.assertEqual(len(loser), 1)
+        self.assertTrue(loser[0].closed)
+        self.assertFalse(response.closed)
+
+    def test_budget_limits_hedges(self):
+        hedger = Hedger(percentile=50, min_samples=10, min_delay=0, budget=0.5, burst=1)
+        warm(hedger, '/a', 0.001, 10)
+
+        for _ in range(4):
+            server = FakeServer(delays=[0.05, 0])
+            hedger.request(server.send, 'GET', 'http://host/a')
+            warm(hedger, '/a', 0.001, 10)
+
+        self.assertEqual(hedger.hedged, 2)
+
+    def test_fast_endpoint_latencies_do_not_hedge_a_slow_one(self):
+        hedger = Hedger(percentile=50, min_samples=10, min_delay=0, budget=1)
+        warm(hedger, '/fast', 0.001, 10)
+        warm(hedger, '/slow', 1.0, 10)
+        server = FakeServer(delays=[0.05])
+
+        hedger.request(server.send, 'GET', 'http://host/slow')
+        self.assertEqual((server.sent, hedger.hedged), (1, 0))
+
+    def test_error_of_one_copy_uses_the_other(self):
+        hedger = Hedger(percentile=50, min_samples=10, min_delay=0, budget=1)
+        warm(hedger, '/a', 0.01, 10)
+        calls = []
+
+        def send(method, url, **kwargs):
+            calls.append(url)
+            if len(calls) == 1:
+                time.sleep(0.05)
+                raise IOError('reset')
+            time.sleep(0.1)
+            return FakeResponse(1)
+
+        self.assertEqual(hedger.request(send, 'GET', 'http://host/a').copy, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Tests for lora.hydration
+"""
+
+import unittest
+
+from lora.hydration import JobHydrator
+
+
+class FakeSession(object):
+
+    def __init__(self):
+        self.queue = []
+        self.fetched = []
+
+    def jobs(self, max_age=None):
+        return self.queue
+
+    def getJobDetails(self, host, jobid):
+        self.fetched.append((host, jobid))
+        states = dict((job['JobID'], job['State']) for job in self.queue)
+        return {'output': {'State': states.get(jobid, 'COMPLETED')}}
+
+
+class JobHydratorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.session = FakeSession()
+        self.hydrator = JobHydrator(self.session, steps=False)
+
+    def state(self, pair):
+        return self.hydrator.hydrate([pair])[pair][0]['output']['State']
+
+    def test_unchanged_jobs_are_not_refetched(self):
+        self.session.queue = [{'Host': 'cab', 'JobID': 1, 'State': 'RUNNING'}]
+        self.state(('cab', 1))
+        self.state(('cab', 1))
+        self.assertEqual(len(self.session.fetched), 1)
+
+    def test_changed_jobs_are_refetched(self):
+        self.session.queue = [{'Host': 'cab', 'JobID': 1, 'State': 'PENDING'}]
+        self.state(('cab', 1))
+        self.session.queue = [{'Host': 'cab', 'JobID': 1, 'State': 'RUNNING'}]
+        self.assertEqual(self.state(('cab', 1)), 'RUNNING')
+
+    def test_jobs_leaving_the_queue_are_refetched_once(self):
+        self.session.queue = [{'Host': 'cab', 'JobID': 1, 'State': 'RUNNING'}]
+        self.state(('cab', 1))
+        self.session.queue = []
+        self.assertEqual(self.state(('cab', 1)), 'COMPLETED')
+        self.state(('cab', 1))
+        self.assertEqual(len(self.session.fetched), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+"""
+Tests for lora.jobs against a fake session standing in for Lora
+"""
+
+import threading
+import time
+import unittest
+
+from lora.jobs import JobWaiter, SubmitError, SubmitPipeline, submit_jobs
+
+
+class FakeScheduler(object):
+    """
+    Accepts submitJob() calls and lists the user's jobs, which finish after a number of listings
+    """
+
+    def __init__(self, max_submit=None, lifetime=1, submit_delay=0.01, fail=()):
+        self.max_submit = max_submit
+        self.lifetime = lifetime
+        self.submit_delay = submit_delay
+        self.fail = set(fail)
+
+        self.lock = threading.Lock()
+        self.next_id = 1000
+        self.jobs = {}
+        self.submitted = []
+        self.inflight = 0
+        self.max_inflight = 0
+        self.max_active = 0
+
+    def getHostJobLimits(self, host):
+        return {'output': {'max_submit': self.max_submit}}
+
+    def getUserJobsForHost(self, host, username='ME'):
+        with self.lock:
+            listing = [{'JobID': jobid, 'State': 'PENDING'} for jobid in self.jobs]
+            for jobid in list(self.jobs):
+                self.jobs[jobid] -= 1
+                if self.jobs[jobid] <= 0:
+                    del self.jobs[jobid]
+        return {'output': {'jobs': listing}}
+
+    def submitJob(self, host, options):
+        with self.lock:
+            self.inflight += 1
+            self.max_inflight = max(self.max_inflight, self.inflight)
+        time.sleep(self.submit_delay)
+        with self.lock:
+            self.inflight -= 1
+            if options.get('name') in self.fail:
+                raise RuntimeError('submission failed')
+            jobid = self.next_id
+            self.next_id += 1
+            self.jobs[jobid] = self.lifetime
+            self.max_active = max(self.max_active, len(self.jobs))
+            self.submitted.append((host, dict(options), jobid))
+        return {'output': {'jobid': jobid}}
+
+
+def specs(count, host='cab'):
+    return [{'host': host, 'options': {'name': 'job%d' % i}} for i in range(count)]
+
+
+class SubmitPipelineTest(unittest.TestCase):
+
+    def test_jobs_over_limit_are_held_until_others_end(self):
+        scheduler = FakeScheduler(max_submit=3)
+        futures = submit_jobs(scheduler, specs(8), poll_interval=0.01)
+
+        self.assertEqual(len(set(f.result() for f in futures)), 8)
+        self.assertLessEqual(scheduler.max_active, 3)
+
+    def test_existing_jobs_count_toward_the_limit(self):
+        scheduler = FakeScheduler(max_submit=3)
+        scheduler.jobs = {1: 2, 2: 2}
+        futures = submit_jobs(scheduler, specs(4), poll_interval=0.01)
+
+        self.assertTrue(all(f.exception() is None for f in futures))
+        self.assertLessEqual(scheduler.max_active, 3)
+
+    def test_unlimited_limits_do_not_hold_jobs(self):
+        for limit in ('UNLIMITED', 'infinite'):
+            scheduler = FakeScheduler(max_submit=limit, lifetime=1000)
+            futures = submit_jobs(scheduler, specs(4))
+
+            self.assertTrue(all(f.exception() is None for f in futures))
+
+    def test_limits_given_as_strings_are_parsed(self):
+        scheduler = FakeScheduler(max_submit='2')
+        futures = submit_jobs(scheduler, specs(4), poll_interval=0.01)
+
+        self.assertTrue(all(f.exception() is None for f in futures))
+        self.assertLessEqual(scheduler.max_active, 2)
+
+    def test_submissions_in_flight_are_capped_per_host(self):
+        scheduler = FakeScheduler(submit_delay=0.05)
+        futures = submit_jobs(scheduler, specs(10), max_per_host=2, max_workers=8)
+
+        self.assertTrue(all(f.exception() is None for f in futures))
+        self.assertEqual(scheduler.max_inflight, 2)
+
+    def test_dependencies_pass_job_ids(self):
+        scheduler = FakeScheduler()
+        jobs = [
+            {'host': 'cab', 'name': 'a', 'options': {'name': 'a'}},
+            {'host': 'cab', 'name': 'b', 'options': {'name': 'b'}},
+            {'host': 'cab', 'options': {'name': 'c'}, 'after': ['a', 'b']},
+        ]
+        a, b, c = submit_jobs(scheduler, jobs)
+
+        options = dict((opts['name'], opts) for _, opts, _ in scheduler.submitted)
+        self.assertEqual(options['c']['dependency'], 'afterok:%s:%s' % (a.result(), b.result()))
+
+    def test_failed_dependency_fails_dependents_without_submitting_them(self):
+        scheduler = FakeScheduler(fail=['a'])
+        jobs = [
+            {'host': 'cab', 'name': 'a', 'options': {'name': 'a'}},
+            {'host': 'cab', 'options': {'name': 'b'}, 'after': ['a']},
+        ]
+        a, b = submit_jobs(scheduler, jobs)
+
+        self.assertIsInstance(a.exception(), RuntimeError)
+        self.assertIsInstance(b.exception(), SubmitError)
+        self.assertEqual(scheduler.submitted, [])
+
+    def test_failed_submissions_are_not_retried(self):
+        scheduler = FakeScheduler(fail=['job1'])
+        futures = submit_jobs(scheduler, specs(3))
+
+        self.assertIsInstance(futures[1].exception(), RuntimeError)
+        self.assertEqual(len(scheduler.submitted), 2)
+
+    def test_shutdown_without_waiting_fails_held_jobs(self):
+        scheduler = FakeScheduler(max_submit=1, lifetime=1000)
+        pipeline = SubmitPipeline(scheduler, poll_interval=0.01)
+        first = pipeline.submit('cab', {'name': 'a'})
+        held = pipeline.submit('cab', {'name': 'b'})
+        first.result()
+        pipeline.shutdown(wait=False)
+
+        self.assertIsInstance(held.exception(), SubmitError)
+
+
+class FakeQueue(object):
+    """
+    Lists a host's queue and answers sacct lookups
+    """
+
+    def __init__(self):
+        self.queue = []
+        self.sacct = []
+        self.down = set()
+
+    def getAllJobDetailsForHost(self, host):
+        if host in self.down:
+            raise RuntimeError('%s is down' % host)
+        return {'output': {'jobs': list(self.queue)}}
+
+    def getSacctJobDetails(self, host, jobid, startDate, endDate):
+        self.sacct.append(jobid)
+        return {'output': {'JobID': jobid, 'State': 'COMPLETED'}}
+
+
+class JobWaiterTest(unittest.TestCase):
+
+    def test_jobs_not_listed_yet_stay_pending_during_grace(self):
+        session = FakeQueue()
+        waiter = JobWaiter(session, [('cab', 1)], grace=60)
+
+        self.assertEqual(waiter.poll(), 1)
+        self.assertEqual(session.sacct, [])
+
+    def test_jobs_leaving_the_queue_are_resolved_from_sacct(self):
+        session = FakeQueue()
+        waiter = JobWaiter(session, [('cab', 1)], grace=60)
+        session.queue = [{'JobID': 1, 'State': 'RUNNING'}]
+        waiter.poll()
+        session.queue = []
+
+        self.assertEqual(waiter.poll(), 0)
+        self.assertEqual(waiter.futures[('cab', 1)].result()['State'], 'COMPLETED')
+
+    def test_jobs_never_listed_are_resolved_after_grace(self):
+        session = FakeQueue()
+        waiter = JobWaiter(session, [('cab', 1)], grace=0)
+
+        self.assertEqual(waiter.poll(), 0)
+        self.assertEqual(session.sacct, [1])
+
+    def test_terminal_jobs_resolve_from_the_queue(self):
+        session = FakeQueue()
+        session.queue = [{'JobID': 1, 'State': 'FAILED'}]
+        waiter = JobWaiter(session, [('cab', 1)])
+
+        self.assertEqual(waiter.poll(), 0)
+        self.assertEqual(waiter.futures[('cab', 1)].result()['State'], 'FAILED')
+
+    def test_host_failing_to_list_stays_pending_and_is_retried(self):
+        session = FakeQueue()
+        session.queue = [{'JobID': 1, 'State': 'COMPLETED'}]
+        session.down = set(['quartz'])
+        waiter = JobWaiter(session, [('cab', 1), ('quartz', 1)], grace=0)
+
+        self.assertEqual(waiter.poll(), 1)
+        self.assertEqual(waiter.pending, set([('quartz', 1)]))
+        self.assertEqual(session.sacct, [])
+
+        session.down = set()
+        self.assertEqual(waiter.poll(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
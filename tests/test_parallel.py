@@ -0,0 +1,74 @@
+"""
+Tests for lora.parallel
+"""
+
+import threading
+import time
+import unittest
+
+from lora.parallel import fan_out, fan_out_iter
+
+
+class FanOutIterTest(unittest.TestCase):
+
+    def test_closing_early_cancels_calls_not_started(self):
+        calls = []
+        lock = threading.Lock()
+
+        def call(key):
+            with lock:
+                calls.append(key)
+            time.sleep(0.02)
+            return key
+
+        results = fan_out_iter(call, range(20), max_workers=2)
+        next(results)
+        results.close()
+        time.sleep(0.1)
+
+        self.assertLessEqual(len(calls), 4)
+
+    def test_calls_are_submitted_in_a_bounded_window(self):
+        lock = threading.Lock()
+        state = {'submitted': 0, 'yielded': 0, 'ahead': 0}
+
+        def call(key):
+            with lock:
+                state['submitted'] = max(state['submitted'], key + 1)
+            return key
+
+        results = []
+        for key, future in fan_out_iter(call, range(100), max_workers=2):
+            with lock:
+                state['yielded'] += 1
+                state['ahead'] = max(state['ahead'], state['submitted'] - state['yielded'])
+            results.append(future.result())
+
+        self.assertEqual(sorted(results), list(range(100)))
+        self.assertLessEqual(state['ahead'], 4)
+
+    def test_stragglers_are_yielded_after_the_timeout(self):
+        def call(key):
+            time.sleep(0.5 if key == 'slow' else 0)
+            return key
+
+        done = dict((key, future.done()) for key, future in fan_out_iter(call, ['fast', 'slow'], timeout=0.1))
+        self.assertEqual(done, {'fast': True, 'slow': False})
+
+
+class FanOutTest(unittest.TestCase):
+
+    def test_results_by_key(self):
+        self.assertEqual(fan_out(lambda k: k * 2, [1, 2, 3]), {1: 2, 2: 4, 3: 6})
+
+    def test_first_exception_is_raised(self):
+        def call(key):
+            if key == 2:
+                raise ValueError(key)
+            return key
+
+        self.assertRaises(ValueError, fan_out, call, [1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
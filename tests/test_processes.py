@@ -0,0 +1,68 @@
+"""
+Tests for lora.processes against a fake session standing in for Lora
+"""
+
+import unittest
+
+from lora.processes import kill
+
+
+class FakeKiller(object):
+    """
+    Records killProcess() calls, optionally answering with a status per pid
+    """
+
+    def __init__(self, per_pid=None, fail_hosts=()):
+        self.per_pid = per_pid
+        self.fail_hosts = set(fail_hosts)
+        self.calls = []
+
+    def killProcess(self, hosts, pids):
+        self.calls.append((list(hosts), list(pids)))
+        if set(hosts) & self.fail_hosts:
+            raise RuntimeError('host down')
+        output = dict((str(pid), self.per_pid[pid]) for pid in pids) if self.per_pid else ''
+        return {'error': '', 'output': output, 'status': 'OK'}
+
+
+def procs(*pairs):
+    return [{'host': host, 'pid': pid} for host, pid in pairs]
+
+
+class KillTest(unittest.TestCase):
+
+    def test_each_post_names_one_host(self):
+        session = FakeKiller()
+        kill(session, procs(('cab', 1), ('quartz', 2), ('cab', 3)))
+
+        self.assertEqual(sorted(session.calls), [(['cab'], [1, 3]), (['quartz'], [2])])
+
+    def test_batches_are_split_per_host(self):
+        session = FakeKiller()
+        kill(session, procs(('cab', 1), ('cab', 2), ('cab', 3)), batch_size=2)
+
+        self.assertEqual(session.calls, [(['cab'], [1, 2]), (['cab'], [3])])
+
+    def test_per_pid_statuses_are_reported(self):
+        session = FakeKiller(per_pid={1: 'killed', 2: 'not found'})
+        outcomes = kill(session, procs(('cab', 1), ('cab', 2)))
+
+        self.assertEqual([o.status for o in outcomes], ['killed', 'not found'])
+
+    def test_failed_host_does_not_stop_the_others(self):
+        session = FakeKiller(fail_hosts=['cab'])
+        outcomes = dict(((o.host, o.pid), o) for o in kill(session, procs(('cab', 1), ('quartz', 2))))
+
+        self.assertIsInstance(outcomes[('cab', 1)].error, RuntimeError)
+        self.assertEqual(outcomes[('quartz', 2)].status, 'OK')
+
+    def test_dry_run_sends_nothing(self):
+        session = FakeKiller()
+        outcomes = kill(session, procs(('cab', 1)), dry_run=True)
+
+        self.assertEqual(session.calls, [])
+        self.assertEqual(outcomes[0].status, 'dry-run')
+
+
+if __name__ == '__main__':
+    unittest.main()
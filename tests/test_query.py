@@ -0,0 +1,60 @@
+"""
+Tests for lora.query
+"""
+
+import time
+import unittest
+
+from lora.query import JobPlanner
+
+
+class FakeSession(object):
+
+    def __init__(self):
+        self.calls = []
+
+    def listing(self, name):
+        self.calls.append(name)
+        return {'output': {'jobs': [
+            {'Host': 'cab', 'User': 'a', 'State': 'RUNNING'},
+            {'Host': 'quartz', 'User': 'b', 'State': 'PENDING'},
+        ]}}
+
+    def getAllJobDetails(self):
+        return self.listing('all')
+
+    def getAllJobDetailsForHost(self, host):
+        return self.listing('host')
+
+    def getUserJobs(self, user):
+        return self.listing('user')
+
+    def getUserJobsForHost(self, host, user):
+        return self.listing('user_host')
+
+
+class JobPlannerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.session = FakeSession()
+        self.planner = JobPlanner(self.session, max_age=0.2)
+
+    def test_fresh_wider_snapshot_answers_narrower_query(self):
+        self.planner.jobs()
+        self.assertEqual(len(self.planner.jobs(host='cab', user='a')), 1)
+        self.assertEqual(self.session.calls, ['all'])
+
+    def test_wider_snapshot_replaces_narrower_ones(self):
+        self.planner.jobs(host='cab')
+        self.planner.jobs(user='a')
+        self.planner.jobs()
+        self.assertEqual(list(self.planner.snapshots), [('all',)])
+
+    def test_stale_snapshots_are_dropped(self):
+        self.planner.jobs()
+        time.sleep(0.5)
+        self.assertEqual(self.planner.snapshots, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Tests for lora.transports against a local HTTP server
+"""
+
+import json
+import threading
+import unittest
+
+import requests
+
+from lora.transports import HttpxTransport, Urllib3Transport
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:  # Python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Sets cookies on /login and echoes the Cookie header it was sent on any other path
+    """
+
+    def do_GET(self):
+        self.send_response(200)
+        if self.path == '/login':
+            self.send_header('Set-Cookie', 'token=abc; Path=/api')
+            self.send_header('Set-Cookie', 'theme=dark; Path=/')
+        body = json.dumps({'cookie': self.headers.get('Cookie')}).encode('utf-8')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TransportTests(object):
+    """
+    Tests run against each transport; subclasses set make_transport
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), Handler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+        cls.base = 'http://127.0.0.1:%d' % cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.session = requests.Session()
+        self.session.trust_env = False
+        self.transport = self.make_transport()
+
+    def tearDown(self):
+        self.transport.close()
+
+    def get(self, path):
+        return self.transport.request(self.session, 'GET', self.base + path, timeout=5)
+
+    def sent_cookie(self, path):
+        return self.get(path).json()['cookie']
+
+    def test_set_cookie_is_stored_in_the_jar(self):
+        self.get('/login')
+
+        self.assertEqual(dict((c.name, c.path) for c in self.session.cookies), {'token': '/api', 'theme': '/'})
+
+    def test_cookies_are_sent_only_on_their_path(self):
+        self.get('/login')
+
+        self.assertEqual(sorted(self.sent_cookie('/api/jobs').split('; ')), ['theme=dark', 'token=abc'])
+        self.assertEqual(self.sent_cookie('/other'), 'theme=dark')
+
+    def test_cookies_of_other_domains_and_secure_cookies_are_not_sent(self):
+        self.session.cookies.set('elsewhere', '1', domain='other.example', path='/')
+        self.session.cookies.set('secret', '1', domain='127.0.0.1', path='/', secure=True)
+        self.session.cookies.set('plain', '1', domain='127.0.0.1', path='/')
+
+        self.assertEqual(self.sent_cookie('/api'), 'plain=1')
+
+    def test_proxies_raise(self):
+        self.session.proxies = {'http': 'http://proxy.example:3128'}
+
+        self.assertRaises(ValueError, self.get, '/api')
+
+
+class Urllib3TransportTest(TransportTests, unittest.TestCase):
+
+    def make_transport(self):
+        return Urllib3Transport()
+
+
+@unittest.skipIf(httpx is None, 'httpx is not installed')
+class HttpxTransportTest(TransportTests, unittest.TestCase):
+
+    def make_transport(self):
+        return HttpxTransport(http2=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+"""
+Tests for lora.util
+"""
+
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from lora.util import open_private
+
+
+class OpenPrivateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'secret')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def mode(self):
+        return stat.S_IMODE(os.stat(self.path).st_mode)
+
+    def test_new_files_are_private(self):
+        with open_private(self.path) as f:
+            f.write('token')
+        self.assertEqual(self.mode(), 0o600)
+
+    def test_existing_files_are_made_private_and_replaced(self):
+        with open(self.path, 'w') as f:
+            f.write('a much longer previous content')
+        os.chmod(self.path, 0o644)
+
+        with open_private(self.path) as f:
+            f.write('token')
+        self.assertEqual(self.mode(), 0o600)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), 'token')
+
+
+if __name__ == '__main__':
+    unittest.main()